@@ -3,6 +3,8 @@
 Usage:
     python backfill.py --limit 50
     python backfill.py --channel @MalikaBozor --limit 100
+    python backfill.py --limit 50 --concurrency 3
+    python backfill.py --limit 1000 --batch-api   # OpenAI Batch API: half price, up to 24h
 """
 
 import asyncio
@@ -10,7 +12,8 @@ import argparse
 
 from loguru import logger
 from src.crawler import TelegramCrawler
-from src.database.connection import init_db
+from src.utils.runtime import run
+from src.database.connection import init_db, close_db
 from src.utils.channels import load_channels
 
 
@@ -19,32 +22,50 @@ async def main() -> None:
     parser.add_argument("--limit", type=int, default=20, help="Messages per channel (default: 20)")
     parser.add_argument("--channel", type=str, help="Specific channel (e.g. @MalikaBozor)")
     parser.add_argument("--min-id", type=int, default=0, help="Minimum message ID")
+    parser.add_argument("--concurrency", type=int, default=5, help="Channels backfilled in parallel (default: 5)")
+    parser.add_argument("--batch-api", action="store_true", help="Classify via OpenAI Batch API (cheaper, slow)")
     args = parser.parse_args()
 
     await init_db()
-
     crawler = TelegramCrawler()
-    await crawler.initialize_clients()
+    try:
+        await crawler.initialize_clients()
+
+        if args.channel:
+            count = await crawler.backfill_channel(
+                args.channel, limit=args.limit, min_id=args.min_id, use_batch_api=args.batch_api,
+            )
+            logger.success(f"Backfill done: {count} messages from {args.channel}")
+            return
 
-    if args.channel:
-        count = await crawler.backfill_channel(args.channel, limit=args.limit, min_id=args.min_id)
-        logger.success(f"Backfill done: {count} messages from {args.channel}")
-    else:
         channels = load_channels()
         if not channels:
             logger.error("No channels in channels.txt")
             return
 
+        # Batch jobs wait hours on OpenAI, not Telegram; don't let them queue behind each other
+        sem = asyncio.Semaphore(len(channels) if args.batch_api else max(1, args.concurrency))
+
+        async def _one(ch: str) -> int:
+            async with sem:
+                return await crawler.backfill_channel(
+                    ch, limit=args.limit, min_id=args.min_id, use_batch_api=args.batch_api,
+                )
+
+        counts = await asyncio.gather(*[_one(ch) for ch in channels], return_exceptions=True)
+
         total = 0
-        for ch in channels:
-            count = await crawler.backfill_channel(ch, limit=args.limit, min_id=args.min_id)
-            total += count
-            await asyncio.sleep(2)
+        for ch, count in zip(channels, counts):
+            if isinstance(count, BaseException):
+                logger.error(f"Backfill failed for {ch}: {count}")
+            else:
+                total += count
 
         logger.success(f"Backfill complete: {total} messages from {len(channels)} channels")
-
-    await crawler.stop()
+    finally:
+        await crawler.stop()
+        await close_db()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
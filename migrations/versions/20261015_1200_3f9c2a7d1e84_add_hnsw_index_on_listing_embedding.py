@@ -0,0 +1,43 @@
+"""add hnsw index on listing embedding
+
+Revision ID: 3f9c2a7d1e84
+Revises: 78cbfeb3144c
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e84'
+down_revision: Union[str, Sequence[str], None] = '78cbfeb3144c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction; build without locking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_listings_embedding_hnsw', 'listings', ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_listings_embedding_hnsw', table_name='listings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
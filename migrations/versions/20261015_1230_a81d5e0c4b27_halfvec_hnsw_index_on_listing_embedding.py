@@ -0,0 +1,53 @@
+"""halfvec hnsw index on listing embedding
+
+Revision ID: a81d5e0c4b27
+Revises: 3f9c2a7d1e84
+Create Date: 2026-10-15 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81d5e0c4b27'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # halfvec needs pgvector >= 0.7; pick up the newer extension after an image bump
+    op.execute("ALTER EXTENSION vector UPDATE")
+    # ALTER EXTENSION only upgrades to what the server has installed; fail before
+    # touching the fp32 index if that is still too old. Search also sets
+    # hnsw.iterative_scan, which arrived in 0.8.
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar_one()
+    if tuple(int(part) for part in version.split(".")[:2]) < (0, 8):
+        raise RuntimeError(
+            f"pgvector {version} is installed; halfvec indexes and iterative scans need >= 0.8. "
+            "Upgrade the server package (e.g. the pgvector/pgvector:pg15 image) and re-run."
+        )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_listings_embedding_hnsw_half "
+            "ON listings USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_listings_embedding_hnsw")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_listings_embedding_hnsw "
+            "ON listings USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_listings_embedding_hnsw_half")
@@ -1,7 +1,7 @@
 """Run the Telegram search bot."""
 
-import asyncio
+from src.utils.runtime import run
 from src.bot import main
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
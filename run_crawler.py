@@ -1,7 +1,7 @@
 """Run the Telegram channel crawler."""
 
-import asyncio
+from src.utils.runtime import run
 from src.crawler import TelegramCrawler
 
 if __name__ == "__main__":
-    asyncio.run(TelegramCrawler().start())
+    run(TelegramCrawler().start())
@@ -1,30 +1,47 @@
 """AI pipeline — listing classification and search result reranking via OpenAI."""
 
+import asyncio
 import json
 import time
 from typing import Any, Dict, List, Optional
 from loguru import logger
-from openai import AsyncOpenAI, OpenAIError
+from openai import OpenAIError
 
 from src.config import get_config
+from src.openai_client import get_openai_client
 from src.prompts import LISTING_CHECK_PROMPT, RERANK_PROMPT, create_listing_check_prompt, create_rerank_prompt
+from src.utils.cache import MISSING, TTLCache, text_key
+
+# Channels repost the same text constantly; remember verdicts (incl. "not a listing")
+CLASSIFY_CACHE_SIZE = 5000
+CLASSIFY_CACHE_TTL = 7 * 24 * 3600
+# Popular queries repeat across users while the candidate set changes slowly
+RERANK_CACHE_SIZE = 1000
+RERANK_CACHE_TTL = 600
+# OpenAI Batch API (half price, up to 24h turnaround) — offline backfill only
+BATCH_POLL_INTERVAL = 60  # seconds between status checks
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
 
 
 class AIParser:
     def __init__(self) -> None:
-        cfg = get_config()
-        self.client = AsyncOpenAI(api_key=cfg.openai.api_key)
-        self.model = cfg.openai.model
+        self.client = get_openai_client()
+        cfg = get_config().openai
+        self.model = cfg.model
+        self._sem = asyncio.Semaphore(cfg.max_concurrency)
+        self._classify_cache: TTLCache[Optional[Dict[str, Any]]] = TTLCache(CLASSIFY_CACHE_SIZE, CLASSIFY_CACHE_TTL)
+        self._rerank_cache: TTLCache[List[int]] = TTLCache(RERANK_CACHE_SIZE, RERANK_CACHE_TTL)
 
     async def _call(self, system: str, user: str, temperature: float = 0.2) -> Optional[Dict[str, Any]]:
         """Send an async chat completion request expecting JSON back."""
         try:
-            resp = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                temperature=temperature,
-                response_format={"type": "json_object"},
-            )
+            async with self._sem:
+                resp = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                    temperature=temperature,
+                    response_format={"type": "json_object"},
+                )
             content = resp.choices[0].message.content
             return json.loads(content) if content else None
         except (OpenAIError, json.JSONDecodeError) as e:
@@ -40,33 +57,136 @@ class AIParser:
           - "raw_response": the raw JSON string from OpenAI
           - "processing_time_ms": int
         Or None if the message is not a listing.
+
+        Verdicts are cached by normalized text, so reposts skip the API call.
         """
+        key = text_key(text)
+        cached = self._classify_cache.get(key)
+        if cached is not MISSING:
+            return cached
+
         start = time.monotonic()
         result = await self._call(LISTING_CHECK_PROMPT, create_listing_check_prompt(text), temperature=0.1)
         elapsed_ms = int((time.monotonic() - start) * 1000)
 
-        if not result or not result.get("is_listing"):
-            return None
-
-        metadata = result.get("metadata") or {}
-        confidence = result.get("confidence", 0.0)
+        if not result:
+            return None  # API/parse error — not a verdict, don't cache
+        parsed = self._listing_result(result, elapsed_ms)
+        self._classify_cache.set(key, parsed)
+        return parsed
 
+    @staticmethod
+    def _listing_result(result: Dict[str, Any], elapsed_ms: int) -> Optional[Dict[str, Any]]:
+        """Shape a parsed classifier response into the ``classify_and_extract`` result."""
+        if not result.get("is_listing"):
+            return None
         return {
-            "metadata": metadata,
-            "confidence": float(confidence),
+            "metadata": result.get("metadata") or {},
+            "confidence": float(result.get("confidence", 0.0)),
             "raw_response": json.dumps(result, ensure_ascii=False),
             "processing_time_ms": elapsed_ms,
         }
 
+    async def classify_many(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Run ``classify_and_extract`` over *texts* concurrently, results aligned to input.
+
+        Fan-out is bounded by ``OPENAI_MAX_CONCURRENCY``; a failed item comes back as None.
+        """
+        results = await asyncio.gather(*(self.classify_and_extract(t) for t in texts), return_exceptions=True)
+        out: List[Optional[Dict[str, Any]]] = []
+        for r in results:
+            if isinstance(r, BaseException):
+                logger.error(f"Classification failed: {r}")
+                out.append(None)
+            else:
+                out.append(r)
+        return out
+
+    async def classify_batch_submit(self, texts: List[str]) -> str:
+        """Upload *texts* as one OpenAI Batch API job; returns the batch id.
+
+        Each request's ``custom_id`` is its index in *texts*.
+        """
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": LISTING_CHECK_PROMPT},
+                        {"role": "user", "content": create_listing_check_prompt(text)},
+                    ],
+                    "temperature": 0.1,
+                    "response_format": {"type": "json_object"},
+                },
+            }, ensure_ascii=False)
+            for i, text in enumerate(texts)
+        ]
+        upload = await self.client.files.create(
+            file=("classify.jsonl", "\n".join(lines).encode()), purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h",
+        )
+        return batch.id
+
+    async def classify_batch_collect(self, batch_id: str, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Wait for a batch from ``classify_batch_submit(texts)``; results aligned to *texts*.
+
+        Items that errored or never ran come back as None. Verdicts are added to the
+        classification cache like live calls.
+        """
+        while True:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status in BATCH_TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+
+        out: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        if batch.status != "completed":
+            logger.error(f"OpenAI batch {batch_id} ended as {batch.status}")
+        if not batch.output_file_id:
+            return out
+
+        # An expired batch still publishes the requests it finished
+        content = await self.client.files.content(batch.output_file_id)
+        for line in content.text.splitlines():
+            try:
+                item = json.loads(line)
+                body = item["response"]["body"]
+                result = json.loads(body["choices"][0]["message"]["content"])
+                i = int(item["custom_id"])
+                if not 0 <= i < len(texts):
+                    raise ValueError(f"custom_id {i} out of range")
+                if not isinstance(result, dict):
+                    raise ValueError(f"expected a JSON object, got {type(result).__name__}")
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.error(f"Batch result parse failed: {e}")
+                continue
+            parsed = self._listing_result(result, 0)  # no per-request latency in batch mode
+            self._classify_cache.set(text_key(texts[i]), parsed)
+            out[i] = parsed
+        return out
+
     async def rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[int]:
         """Return ordered indices of the most relevant candidates for *query*."""
         if not candidates:
             return []
+        # Indices are positional, so the key keeps candidate order
+        key = (text_key(query), tuple(c["id"] for c in candidates))
+        cached = self._rerank_cache.get(key)
+        if cached is not MISSING:
+            return list(cached)
+
         result = await self._call(RERANK_PROMPT, create_rerank_prompt(query, candidates))
         if not result:
-            return list(range(min(5, len(candidates))))
+            return list(range(min(5, len(candidates))))  # fallback — not cached
         indices = result.get("relevant_indices", [])
-        return [i for i in indices if isinstance(i, int) and 0 <= i < len(candidates)]
+        ranked = [i for i in indices if isinstance(i, int) and 0 <= i < len(candidates)]
+        self._rerank_cache.set(key, ranked)
+        return list(ranked)
 
 
 _instance: Optional[AIParser] = None
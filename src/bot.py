@@ -4,31 +4,45 @@ User sends query → embed → pgvector → AI rerank → return results.
 """
 
 import asyncio
-from datetime import datetime
+import time
 
 from aiogram import Bot, Dispatcher, Router, F
 from aiogram.filters import Command, CommandStart
-from aiogram.types import Message, CallbackQuery, InaccessibleMessage
+from aiogram.types import Message, CallbackQuery, InaccessibleMessage, LinkPreviewOptions
 from aiogram.enums import ParseMode, ChatAction
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramBadRequest
 from loguru import logger
 
 from src.config import get_config
-from src.database import init_db
-from src.database.repository import UserRepository, ListingRepository, SearchAnalyticsRepository
+from src.database import init_db, ping_db
+from src.database.repository import ListingRepository
 from src.notifier import get_notifier
+from src.openai_client import close_openai_client, warmup_openai_client
 from src.search_engine import get_search_engine
 from src.i18n import get_i18n
 from src.bot_utils.formatters import (
     format_welcome_message, format_help_message,
     format_language_selection, format_no_results, format_search_header,
     create_language_keyboard, format_result_message, format_valuation_result,
+    message_length, result_link, TELEGRAM_MAX_MESSAGE,
 )
 from src.bot_utils.language import get_user_language, set_user_language, get_language_success_message
-from src.bot_utils.admin import router as admin_router
+from src.bot_utils.admin import close_backfill_client, router as admin_router
+from src.bot_utils.analytics import get_analytics
+from src.utils.system import get_system_info
+
+BOT_HTTP_LIMIT = 100  # simultaneous Bot API connections
+BOT_HTTP_KEEPALIVE = 75  # seconds an idle Bot API connection stays open
 
 config = get_config()
-bot = Bot(token=config.bot.token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+# One long-lived aiohttp pool for all Bot API calls. aiohttp drops idle sockets
+# after 15s by default, so most searches would open a fresh TLS connection;
+# aiogram has no public knob for the connector, hence _connector_init.
+_session = AiohttpSession(limit=BOT_HTTP_LIMIT)
+_session._connector_init.update(keepalive_timeout=BOT_HTTP_KEEPALIVE)
+bot = Bot(token=config.bot.token, session=_session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 dp = Dispatcher()
 router = Router(name="main")
 i18n = get_i18n()
@@ -38,21 +52,18 @@ i18n = get_i18n()
 # User tracking
 # ---------------------------------------------------------------------------
 
-async def _track_user(message: Message) -> None:
-    """Upsert user from a message — fire-and-forget."""
+def _track_user(message: Message) -> None:
+    """Queue a user upsert (deduplicated by the analytics buffer)."""
     u = message.from_user
     if not u:
         return
-    try:
-        await UserRepository.upsert_from_message(
-            telegram_id=u.id,
-            username=u.username,
-            first_name=u.first_name,
-            last_name=u.last_name,
-            language_code=u.language_code,
-        )
-    except Exception as e:
-        logger.error(f"User tracking failed: {e}")
+    get_analytics().record_user(
+        telegram_id=u.id,
+        username=u.username,
+        first_name=u.first_name,
+        last_name=u.last_name,
+        language_code=u.language_code,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -60,23 +71,18 @@ async def _track_user(message: Message) -> None:
 # ---------------------------------------------------------------------------
 
 async def _perform_search(query_text: str, user_id: int) -> dict:
-    """Embed query → pgvector top 50 → AI rerank → top 5."""
-    start = datetime.now()
+    """Embed query → pgvector top 20 → AI rerank → top 5."""
+    start = time.monotonic()
     results = await get_search_engine().search(query_text, limit=5)
-    elapsed_ms = int((datetime.now() - start).total_seconds() * 1000)
+    elapsed_ms = int((time.monotonic() - start) * 1000)
 
     result_ids = [r["id"] for r in results if r.get("id")]
 
-    try:
-        await UserRepository.increment_searches(user_id)
-        await SearchAnalyticsRepository.record(
-            user_id=user_id, query_text=query_text,
-            results_count=len(results), response_time_ms=elapsed_ms,
-            result_listing_ids=result_ids,
-        )
-    except Exception as e:
-        logger.error(f"Analytics tracking failed: {e}")
-        await get_notifier().error("analytics", e)
+    get_analytics().record_search(
+        user_id=user_id, query_text=query_text,
+        results_count=len(results), response_time_ms=elapsed_ms,
+        result_listing_ids=result_ids,
+    )
 
     try:
         await get_notifier().search(user_id, query_text, len(results), elapsed_ms)
@@ -91,8 +97,11 @@ async def _send_search_results(message: Message, query: str, lang: str) -> None:
     if not message.from_user:
         return
 
-    await bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING)
-    status = await message.answer(f"🔍 <i>{i18n.get('search.searching', lang)}</i>")
+    # Typing indicator and status message are independent: one round trip, not two
+    _, status = await asyncio.gather(
+        bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING),
+        message.answer(f"🔍 <i>{i18n.get('search.searching', lang)}</i>"),
+    )
 
     try:
         data = await _perform_search(query, message.from_user.id)
@@ -103,12 +112,27 @@ async def _send_search_results(message: Message, query: str, lang: str) -> None:
             await message.answer(format_no_results(lang, query))
             return
 
-        await message.answer(format_search_header(lang, len(results), query, data["processing_time_ms"]))
-        for i, r in enumerate(results, 1):
+        header = format_search_header(lang, len(results), query, data["processing_time_ms"])
+        blocks = [b for b in (format_result_message(i, r) for i, r in enumerate(results, 1)) if b]
+        combined = "\n\n".join([header, *blocks])
+        if message_length(combined) <= TELEGRAM_MAX_MESSAGE:
+            # One message, one round trip; the preview card shows the top result
             try:
-                await message.answer(format_result_message(i, r), disable_web_page_preview=False)
-            except Exception as e:
-                logger.error(f"Failed to send result {i}: {e}")
+                await message.answer(combined, link_preview_options=LinkPreviewOptions(url=result_link(results[0])))
+                return
+            except TelegramBadRequest as e:
+                logger.warning(f"Combined results rejected, sending separately: {e}")
+
+        await message.answer(header)
+        # Too long for one message: sent concurrently (≤5, under Telegram's per-chat burst allowance); results
+        # are numbered, so arrival order doesn't matter
+        sent = await asyncio.gather(
+            *(message.answer(block, disable_web_page_preview=False) for block in blocks),
+            return_exceptions=True,
+        )
+        for i, outcome in enumerate(sent, 1):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to send result {i}: {outcome}")
 
     except Exception as e:
         logger.error(f"Search error: {e}")
@@ -125,7 +149,7 @@ async def _send_search_results(message: Message, query: str, lang: str) -> None:
 async def cmd_start(message: Message):
     if not message.from_user:
         return
-    await _track_user(message)
+    _track_user(message)
     await message.answer(
         "👋 <b>Welcome to Tele-Google!</b>\n"
         "Добро пожаловать в Tele-Google!\n"
@@ -139,7 +163,7 @@ async def cmd_start(message: Message):
 async def cmd_help(message: Message):
     if not message.from_user:
         return
-    await _track_user(message)
+    _track_user(message)
     lang = await get_user_language(message.from_user.id, message.from_user.language_code)
     await message.answer(format_help_message(lang))
 
@@ -148,7 +172,7 @@ async def cmd_help(message: Message):
 async def cmd_language(message: Message):
     if not message.from_user:
         return
-    await _track_user(message)
+    _track_user(message)
     lang = await get_user_language(message.from_user.id, message.from_user.language_code)
     await message.answer(format_language_selection(lang), reply_markup=create_language_keyboard())
 
@@ -158,7 +182,7 @@ async def cmd_price(message: Message):
     """Valuation command — /price iPhone 13 128GB → returns market price range."""
     if not message.from_user or not message.text:
         return
-    await _track_user(message)
+    _track_user(message)
     lang = await get_user_language(message.from_user.id, message.from_user.language_code)
 
     parts = message.text.split(maxsplit=1)
@@ -174,8 +198,10 @@ async def cmd_price(message: Message):
         return
 
     query = parts[1].strip()
-    await bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING)
-    status = await message.answer(f"💰 <i>Analyzing prices for: {query}</i>")
+    _, status = await asyncio.gather(
+        bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING),
+        message.answer(f"💰 <i>Analyzing prices for: {query}</i>"),
+    )
 
     try:
         result = await get_search_engine().valuate(query)
@@ -207,7 +233,7 @@ async def cmd_price(message: Message):
 async def handle_text_message(message: Message):
     if not message.text or not message.from_user:
         return
-    await _track_user(message)
+    _track_user(message)
     lang = await get_user_language(message.from_user.id, message.from_user.language_code)
     await _send_search_results(message, message.text.strip(), lang)
 
@@ -238,6 +264,19 @@ async def handle_noop(callback: CallbackQuery):
 # ---------------------------------------------------------------------------
 
 HEALTH_INTERVAL = 21600   # 6 hours
+WARMUP_TIMEOUT = 5  # seconds per warmup step; startup never waits longer
+
+
+async def _warmup() -> None:
+    """Open DB and OpenAI connections so the first search skips TCP/TLS setup."""
+    steps = {"database": ping_db(), "openai": warmup_openai_client()}
+    results = await asyncio.gather(
+        *(asyncio.wait_for(step, WARMUP_TIMEOUT) for step in steps.values()),
+        return_exceptions=True,
+    )
+    for name, result in zip(steps, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Warmup {name} failed: {result!r}")
 
 
 async def _periodic_health():
@@ -246,16 +285,7 @@ async def _periodic_health():
     while True:
         await asyncio.sleep(HEALTH_INTERVAL)
         try:
-            # System stats
-            proc = await asyncio.create_subprocess_shell(
-                "free -m | awk 'NR==2{printf \"RAM: %s/%sMB (%.0f%%)\", $3,$2,$3*100/$2}' && "
-                "echo '' && free -m | awk 'NR==3{printf \"Swap: %s/%sMB\", $3,$2}' && "
-                "echo '' && df -h / | awk 'NR==2{printf \"Disk: %s/%s (%s)\", $3,$2,$5}'",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
-            sys_info = stdout.decode().strip()
+            sys_info = get_system_info()
 
             # DB stats
             counts = await ListingRepository.get_counts()
@@ -295,6 +325,8 @@ async def main():
     notifier = get_notifier()
     await notifier.startup("Bot")
     await notifier.start()
+    await get_analytics().start()
+    await _warmup()
 
     health_task = asyncio.create_task(_periodic_health())
     logger.success("Bot started!")
@@ -302,6 +334,9 @@ async def main():
         await dp.start_polling(bot)
     finally:
         health_task.cancel()
+        await get_analytics().stop()
         await notifier.shutdown("Bot")
         await notifier.stop()
         await bot.session.close()
+        await close_backfill_client()
+        await close_openai_client()
@@ -2,82 +2,148 @@
 
 import asyncio
 import shutil
-from functools import wraps
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Dict, Optional
 
 from aiogram import Router
-from aiogram.filters import Command
+from aiogram.filters import Command, Filter
 from aiogram.types import Message
 from loguru import logger
-from sqlalchemy import select, func, delete, text
+from telethon import TelegramClient
+from telethon.errors import UnauthorizedError
 
 from src.config import get_config
-from src.database import get_session
-from src.database.models import Listing, User
-from src.database.repository import ChannelRepository
+from src.crawler import TelegramCrawler
+from src.database.repository import (
+    ChannelRepository, ListingRepository, SearchAnalyticsRepository, UserRepository,
+)
 from src.bot_utils.formatters import esc_html
+from src.search_engine import get_search_engine
 from src.utils.channels import load_channels, save_channels
 
 router = Router(name="admin")
 config = get_config()
+# Bound once; config is loaded at startup and never reloaded
+ADMIN_IDS = config.bot.admin_user_ids  # frozenset
+API_ID, API_HASH, PHONE = config.telegram.api_id, config.telegram.api_hash, config.telegram.phone
 
 # State for /auth flow  — stores pending auth per admin user
 _auth_state: Dict[int, dict] = {}
 
 
 # ---------------------------------------------------------------------------
-# Auth decorator
+# Auth filter
 # ---------------------------------------------------------------------------
 
-def admin_only(func):
-    @wraps(func)
-    async def wrapper(message: Message, *args, **kwargs):
-        if not message.from_user or message.from_user.id not in config.bot.admin_user_ids:
-            await message.answer("❌ Admin only.")
-            return
-        return await func(message, *args, **kwargs)
-    return wrapper
+ADMIN_COMMANDS = ("addchannel", "removechannel", "listchannels", "backfill", "stats", "auth", "deploy", "restart")
+
+
+class IsAdmin(Filter):
+    """Pass only messages from configured admins; checked by the router before dispatch."""
+
+    async def __call__(self, message: Message) -> bool:
+        return bool(message.from_user) and message.from_user.id in ADMIN_IDS
 
 
 # ---------------------------------------------------------------------------
-# Backfill helper (reuses the existing authenticated session)
+# Reply helper
 # ---------------------------------------------------------------------------
 
-async def _run_backfill(channel_username: str, limit: int = 50) -> int:
-    from telethon import TelegramClient
-    from src.crawler import TelegramCrawler
+FAST_REPLY_THRESHOLD = 0.3  # seconds; quicker results skip the "⏳" placeholder
 
-    src_session = Path("data/sessions/default_session.session")
-    if not src_session.exists():
-        raise RuntimeError("No Telegram session found — authenticate on the server first")
 
-    # Copy the session file so we don't conflict with the crawler's SQLite lock
-    tmp_session = Path("data/sessions/_backfill_tmp")
-    shutil.copy2(src_session, tmp_session.with_suffix(".session"))
+async def _reply(message: Message, placeholder: str, work: Awaitable[str]) -> None:
+    """Answer with *work*'s text; show *placeholder* (then edit it) only if work is slow."""
+    task = asyncio.ensure_future(work)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=FAST_REPLY_THRESHOLD)
+        if not done:
+            status = await message.answer(placeholder)
+    except BaseException:
+        # Placeholder failed (or we were cancelled): don't leave the work running unobserved
+        task.cancel()
+        raise
+    if done:
+        await message.answer(task.result())
+        return
+    await status.edit_text(await task)
 
-    client = TelegramClient(str(tmp_session), config.telegram.api_id, config.telegram.api_hash)
-    await client.connect()  # type: ignore[misc]
-    if not await client.is_user_authorized():  # type: ignore[misc]
-        raise RuntimeError("Telegram session expired — re-authenticate on the server")
 
-    crawler = TelegramCrawler()
-    crawler.clients = [client]
-    try:
-        return await crawler.backfill_channel(channel_username, limit=limit)
-    finally:
-        await client.disconnect()  # type: ignore[misc]
-        # Clean up temp session files
-        for ext in (".session", ".session-journal"):
-            tmp_session.with_suffix(ext).unlink(missing_ok=True)
+# ---------------------------------------------------------------------------
+# Backfill helper (reuses the existing authenticated session)
+# ---------------------------------------------------------------------------
+
+BACKFILL_SESSION = Path("data/sessions/backfill")
+
+# One connected client and one crawler for /backfill, kept for the bot's lifetime
+_backfill_client: Optional[TelegramClient] = None
+_backfill_crawler: Optional[TelegramCrawler] = None
+_backfill_lock = asyncio.Lock()
+
+
+async def _get_backfill_client() -> TelegramClient:
+    """Return the connected, authorized backfill client; (re)connect on first use, a drop or a revoked session."""
+    global _backfill_client
+    async with _backfill_lock:
+        if _backfill_client is not None:
+            if _backfill_client.is_connected():
+                try:
+                    # One cheap request: is_user_authorized() caches its first answer
+                    if await _backfill_client.get_me() is not None:  # type: ignore[misc]
+                        return _backfill_client
+                except UnauthorizedError as e:
+                    logger.warning(f"Backfill session no longer authorized, reconnecting: {e}")
+            await _backfill_client.disconnect()  # type: ignore[misc]
+            _backfill_client = None
+
+        src_session = Path("data/sessions/default_session.session")
+        if not await asyncio.to_thread(src_session.exists):
+            raise RuntimeError("No Telegram session found — authenticate on the server first")
+
+        # Own copy of the session file so we don't conflict with the crawler's SQLite lock.
+        # Off the event loop: the file can be megabytes and other handlers keep running.
+        await asyncio.to_thread(shutil.copy2, src_session, BACKFILL_SESSION.with_suffix(".session"))
+
+        client = TelegramClient(str(BACKFILL_SESSION), API_ID, API_HASH)
+        await client.connect()  # type: ignore[misc]
+        if not await client.is_user_authorized():  # type: ignore[misc]
+            await client.disconnect()  # type: ignore[misc]
+            raise RuntimeError("Telegram session expired — re-authenticate on the server")
+        _backfill_client = client
+        return client
+
+
+async def close_backfill_client() -> None:
+    """Disconnect the backfill client, if one was opened.
+
+    Called at shutdown, and after /auth so the next backfill copies the fresh session.
+    """
+    global _backfill_client
+    async with _backfill_lock:
+        if _backfill_client is not None:
+            await _backfill_client.disconnect()  # type: ignore[misc]
+            _backfill_client = None
+
+
+def _get_backfill_crawler() -> TelegramCrawler:
+    """Lazily build the crawler; one instance also means one shared backfill rate limiter."""
+    global _backfill_crawler
+    if _backfill_crawler is None:
+        _backfill_crawler = TelegramCrawler()
+    return _backfill_crawler
+
+
+async def _run_backfill(channel_username: str, limit: int = 50) -> int:
+    crawler = _get_backfill_crawler()
+    crawler.clients = [await _get_backfill_client()]  # may have reconnected since last call
+    return await crawler.backfill_channel(channel_username, limit=limit)
 
 
 # ---------------------------------------------------------------------------
 # Commands
 # ---------------------------------------------------------------------------
 
-@router.message(Command("addchannel"))
-@admin_only
+@router.message(Command("addchannel"), IsAdmin())
 async def cmd_add_channel(message: Message):
     if not message.text:
         return
@@ -100,6 +166,7 @@ async def cmd_add_channel(message: Message):
         current.append(channel)
         save_channels(current)
         indexed = await _run_backfill(channel, limit=50)
+        get_search_engine().clear_cache()
         await status.edit_text(
             f"✅ <b>Channel added!</b>\n\n"
             f"📊 {channel}\n📥 Indexed: {indexed} messages\n"
@@ -111,8 +178,7 @@ async def cmd_add_channel(message: Message):
         await status.edit_text(f"❌ Failed to add channel\n\n<code>{esc_html(str(e)[:200])}</code>")
 
 
-@router.message(Command("removechannel"))
-@admin_only
+@router.message(Command("removechannel"), IsAdmin())
 async def cmd_remove_channel(message: Message):
     if not message.text:
         return
@@ -135,18 +201,11 @@ async def cmd_remove_channel(message: Message):
 
     status = await message.answer(f"⏳ Removing {channel}…")
     try:
-        async with get_session() as session:
-            count = (await session.execute(
-                select(func.count()).select_from(Listing).where(Listing.source_channel == channel)
-            )).scalar() or 0
-
         current.remove(channel)
         save_channels(current)
-        await ChannelRepository.deactivate(channel)
-
-        async with get_session() as session:
-            await session.execute(delete(Listing).where(Listing.source_channel == channel))
-            await session.commit()
+        # One transaction; rowcount is exact even if the crawler inserted a row moments ago
+        count = await ChannelRepository.remove(channel)
+        get_search_engine().clear_cache()
 
         await status.edit_text(
             f"✅ <b>Channel removed!</b>\n\n📊 {channel}\n🗑️ Deleted: {count} listings"
@@ -157,38 +216,32 @@ async def cmd_remove_channel(message: Message):
         await status.edit_text(f"❌ Failed to remove channel\n\n<code>{esc_html(str(e)[:200])}</code>")
 
 
-@router.message(Command("listchannels"))
-@admin_only
+@router.message(Command("listchannels"), IsAdmin())
 async def cmd_list_channels(message: Message):
-    status = await message.answer("⏳ Loading…")
+    await _reply(message, "⏳ Loading…", _list_channels_text())
+
+
+async def _list_channels_text() -> str:
     try:
         channels = load_channels()
         if not channels:
-            await status.edit_text("📝 No channels monitored.")
-            return
+            return "📝 No channels monitored."
 
-        stats: List[tuple] = []
-        async with get_session() as session:
-            for ch in channels:
-                count = (await session.execute(
-                    select(func.count()).select_from(Listing).where(Listing.source_channel == ch)
-                )).scalar() or 0
-                stats.append((ch, count))
+        stats = await ListingRepository.count_by_channels(channels)
 
-        total = sum(c for _, c in stats)
+        total = sum(stats.values())
         lines = [f"📊 <b>Channels ({len(channels)})</b>\n"]
-        for ch, count in sorted(stats, key=lambda x: x[1], reverse=True):
+        for ch, count in stats.items():
             lines.append(f"• {ch}: <b>{count}</b>")
         lines.append(f"\n📈 Total: {total} listings")
 
-        await status.edit_text("\n".join(lines))
+        return "\n".join(lines)
     except Exception as e:
         logger.error(f"Failed to list channels: {e}")
-        await status.edit_text(f"❌ Error\n\n<code>{esc_html(str(e)[:200])}</code>")
+        return f"❌ Error\n\n<code>{esc_html(str(e)[:200])}</code>"
 
 
-@router.message(Command("backfill"))
-@admin_only
+@router.message(Command("backfill"), IsAdmin())
 async def cmd_backfill(message: Message):
     if not message.text:
         return
@@ -211,6 +264,7 @@ async def cmd_backfill(message: Message):
     status = await message.answer(f"⏳ Backfilling {channel} ({limit} msgs)…")
     try:
         indexed = await _run_backfill(channel, limit=limit)
+        get_search_engine().clear_cache()
         await status.edit_text(f"✅ <b>Backfill done!</b>\n\n📊 {channel}\n📥 Indexed: {indexed}/{limit}")
         logger.success(f"Admin {message.from_user.id} backfilled {channel} ({indexed}/{limit})")  # type: ignore[union-attr]
     except Exception as e:
@@ -222,73 +276,23 @@ async def cmd_backfill(message: Message):
 # Observability commands
 # ---------------------------------------------------------------------------
 
-@router.message(Command("stats"))
-@admin_only
+@router.message(Command("stats"), IsAdmin())
 async def cmd_stats(message: Message):
     """System overview: totals, metadata coverage, categories, channels."""
-    status = await message.answer("⏳ Gathering stats…")
+    await _reply(message, "⏳ Gathering stats…", _stats_text())
+
+
+async def _stats_text() -> str:
     try:
-        async with get_session() as session:
-            # Total listings
-            total = (await session.execute(
-                select(func.count()).select_from(Listing)
-            )).scalar() or 0
-
-            # Listings with price
-            with_price = (await session.execute(
-                select(func.count()).select_from(Listing).where(Listing.price.isnot(None))
-            )).scalar() or 0
-
-            # Listings with metadata
-            with_meta = (await session.execute(
-                select(func.count()).select_from(Listing).where(Listing.item_metadata.isnot(None))
-            )).scalar() or 0
-
-            # Category breakdown (from JSONB)
-            cat_rows = (await session.execute(
-                select(
-                    Listing.item_metadata["category"].astext.label("cat"),
-                    func.count().label("cnt"),
-                )
-                .where(Listing.item_metadata.isnot(None))
-                .group_by(text("cat"))
-                .order_by(text("cnt DESC"))
-                .limit(10)
-            )).all()
-
-            # Currency breakdown
-            cur_rows = (await session.execute(
-                select(Listing.currency, func.count().label("cnt"))
-                .where(Listing.currency.isnot(None))
-                .group_by(Listing.currency)
-                .order_by(text("cnt DESC"))
-            )).all()
-
-            # Price stats
-            price_stats = (await session.execute(
-                select(
-                    func.min(Listing.price),
-                    func.max(Listing.price),
-                    func.avg(Listing.price),
-                ).where(Listing.price.isnot(None))
-            )).one()
-
-            # Channel breakdown
-            ch_rows = (await session.execute(
-                select(Listing.source_channel, func.count().label("cnt"))
-                .group_by(Listing.source_channel)
-                .order_by(text("cnt DESC"))
-            )).all()
-
-            # User count
-            user_count = (await session.execute(
-                select(func.count()).select_from(User)
-            )).scalar() or 0
-
-            # Search count
-            search_count = (await session.execute(
-                select(func.count()).select_from(text("search_analytics"))
-            )).scalar() or 0
+        # Four independent round trips in flight at once, each on its own pooled connection
+        summary, breakdowns, user_count, search_count = await asyncio.gather(
+            ListingRepository.get_summary(),
+            ListingRepository.get_breakdowns(),
+            UserRepository.count(),
+            SearchAnalyticsRepository.count(),
+        )
+        total, with_price, with_meta = summary["total"], summary["with_price"], summary["with_meta"]
+        cat_rows, cur_rows, ch_rows = breakdowns["categories"], breakdowns["currencies"], breakdowns["channels"]
 
         lines = [
             f"📊 <b>System Stats</b>\n",
@@ -299,9 +303,9 @@ async def cmd_stats(message: Message):
             f"🔍 Searches: <b>{search_count}</b>",
         ]
 
-        if price_stats[0] is not None:
-            lines.append(f"\n💵 <b>Price range:</b> {price_stats[0]:,.0f} – {price_stats[1]:,.0f}")
-            lines.append(f"📏 Avg price: {price_stats[2]:,.0f}")
+        if summary["min_price"] is not None:
+            lines.append(f"\n💵 <b>Price range:</b> {summary['min_price']:,.0f} – {summary['max_price']:,.0f}")
+            lines.append(f"📏 Avg price: {summary['avg_price']:,.0f}")
 
         if cur_rows:
             lines.append(f"\n💱 <b>Currencies:</b>")
@@ -318,10 +322,10 @@ async def cmd_stats(message: Message):
             for ch, cnt in ch_rows:
                 lines.append(f"  • {ch}: {cnt}")
 
-        await status.edit_text("\n".join(lines))
+        return "\n".join(lines)
     except Exception as e:
         logger.error(f"Stats failed: {e}")
-        await status.edit_text(f"❌ Error\n\n<code>{esc_html(str(e)[:200])}</code>")
+        return f"❌ Error\n\n<code>{esc_html(str(e)[:200])}</code>"
 
 
 def _pct(part: int, total: int) -> str:
@@ -333,8 +337,7 @@ def _pct(part: int, total: int) -> str:
 # Remote auth — /auth
 # ---------------------------------------------------------------------------
 
-@router.message(Command("auth"))
-@admin_only
+@router.message(Command("auth"), IsAdmin())
 async def cmd_auth(message: Message):
     """Start remote Telegram authentication for the crawler account."""
     if not message.from_user:
@@ -352,11 +355,11 @@ async def cmd_auth(message: Message):
 
         status = await message.answer("⏳ Signing in…")
         try:
-            from telethon import TelegramClient
             await client.sign_in(phone=phone, code=code, phone_code_hash=phone_code_hash)
             me = await client.get_me()
             name = getattr(me, "first_name", "Unknown")
             await client.disconnect()
+            await close_backfill_client()  # its session copy predates this login
             await status.edit_text(
                 f"✅ <b>Authenticated as {esc_html(name)}</b>\n\n"
                 f"Session saved. Restart the crawler with <code>/restart crawler</code>"
@@ -369,18 +372,17 @@ async def cmd_auth(message: Message):
     # Start new auth flow
     status = await message.answer("⏳ Sending verification code…")
     try:
-        from telethon import TelegramClient
         sessions_dir = Path("data/sessions")
         sessions_dir.mkdir(parents=True, exist_ok=True)
 
         client = TelegramClient(
             str(sessions_dir / "default_session"),
-            config.telegram.api_id,
-            config.telegram.api_hash,
+            API_ID,
+            API_HASH,
         )
         await client.connect()
 
-        phone = config.telegram.phone
+        phone = PHONE
         result = await client.send_code_request(phone)
 
         _auth_state[message.from_user.id] = {
@@ -405,51 +407,63 @@ async def cmd_auth(message: Message):
 # Deploy & restart — /deploy, /restart
 # ---------------------------------------------------------------------------
 
-@router.message(Command("deploy"))
-@admin_only
+# One systemctl call per restart: systemd queues every listed unit's job at once
+# and restarts them in parallel, and exec skips the intermediate /bin/sh
+RESTART_CMD = ("sudo", "systemctl", "restart")
+
+
+async def _run_step(command: str, timeout: float) -> tuple[int, str]:
+    """Run a deploy shell pipeline; pipefail so a failing command isn't masked by its tail."""
+    proc = await asyncio.create_subprocess_exec(
+        "bash", "-o", "pipefail", "-c", command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    return proc.returncode, stdout.decode(errors="replace").strip()
+
+
+@router.message(Command("deploy"), IsAdmin())
 async def cmd_deploy(message: Message):
     """Pull latest code from git and restart all services."""
     status = await message.answer("🚀 <b>Deploying…</b>\n\n⏳ git pull…")
     try:
         # Step 1: git pull
-        proc = await asyncio.create_subprocess_shell(
-            "cd ~/tele-google && git pull origin master 2>&1",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
-        git_output = stdout.decode().strip()
+        # tail, not head: git must never see a closed pipe mid-pull
+        code, git_output = await _run_step("cd ~/tele-google && git pull origin master 2>&1 | tail -c 500", 30)
+        if code != 0:
+            await status.edit_text(f"❌ git pull failed (exit {code})\n\n<pre>{esc_html(git_output)}</pre>")
+            return
 
         await status.edit_text(
             f"🚀 <b>Deploying…</b>\n\n"
-            f"✅ git pull:\n<pre>{esc_html(git_output[:500])}</pre>\n\n"
+            f"✅ git pull:\n<pre>{esc_html(git_output)}</pre>\n\n"
             f"⏳ pip install…"
         )
 
         # Step 2: pip install
-        proc = await asyncio.create_subprocess_shell(
-            "cd ~/tele-google && source venv/bin/activate && pip install -r requirements.txt -q 2>&1 | tail -5",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        code, pip_output = await _run_step(
+            "cd ~/tele-google && source venv/bin/activate && pip install -r requirements.txt -q 2>&1 | tail -c 200",
+            120,
         )
-        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=120)
-        pip_output = stdout.decode().strip()
+        if code != 0:
+            await status.edit_text(f"❌ pip install failed (exit {code})\n\n<pre>{esc_html(pip_output)}</pre>")
+            return
 
         await status.edit_text(
             f"🚀 <b>Deploying…</b>\n\n"
             f"✅ git pull: done\n"
-            f"✅ pip: {esc_html(pip_output[-200:]) if pip_output else 'ok'}\n\n"
+            f"✅ pip: {esc_html(pip_output) if pip_output else 'ok'}\n\n"
             f"⏳ Restarting services…"
         )
 
         # Step 3: restart services
-        proc = await asyncio.create_subprocess_shell(
-            "sudo systemctl restart tele-google-crawler && "
-            "sudo systemctl restart tele-google-bot",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        proc = await asyncio.create_subprocess_exec(
+            *RESTART_CMD, "tele-google-crawler", "tele-google-bot",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
         )
-        await asyncio.wait_for(proc.communicate(), timeout=15)
+        await asyncio.wait_for(proc.wait(), timeout=15)
 
         # Note: the bot process itself will be killed by systemctl restart,
         # so the user won't see this message unless the bot restarts fast enough.
@@ -468,8 +482,7 @@ async def cmd_deploy(message: Message):
         await status.edit_text(f"❌ Deploy failed\n\n<code>{esc_html(str(e)[:200])}</code>")
 
 
-@router.message(Command("restart"))
-@admin_only
+@router.message(Command("restart"), IsAdmin())
 async def cmd_restart(message: Message):
     """Restart a specific service: /restart bot|crawler|all"""
     parts = (message.text or "").split()
@@ -481,14 +494,10 @@ async def cmd_restart(message: Message):
 
     status = await message.answer(f"⏳ Restarting <b>{target}</b>…")
     try:
-        if target == "all":
-            cmd = "sudo systemctl restart tele-google-crawler && sudo systemctl restart tele-google-bot"
-        else:
-            cmd = f"sudo systemctl restart tele-google-{target}"
-
-        proc = await asyncio.create_subprocess_shell(
-            cmd,
-            stdout=asyncio.subprocess.PIPE,
+        units = ("crawler", "bot") if target == "all" else (target,)
+        proc = await asyncio.create_subprocess_exec(
+            *RESTART_CMD, *(f"tele-google-{u}" for u in units),
+            stdout=asyncio.subprocess.DEVNULL,  # only stderr is ever shown
             stderr=asyncio.subprocess.PIPE,
         )
         _, stderr = await asyncio.wait_for(proc.communicate(), timeout=15)
@@ -502,3 +511,13 @@ async def cmd_restart(message: Message):
     except Exception as e:
         logger.error(f"Restart failed: {e}")
         await status.edit_text(f"❌ Error\n\n<code>{esc_html(str(e)[:200])}</code>")
+
+
+# ---------------------------------------------------------------------------
+# Fallback — admin commands from non-admins
+# ---------------------------------------------------------------------------
+
+@router.message(Command(*ADMIN_COMMANDS))
+async def cmd_admin_denied(message: Message):
+    # Registered last: reached only when IsAdmin() rejected the real handler
+    await message.answer("❌ Admin only.")
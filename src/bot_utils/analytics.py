@@ -0,0 +1,167 @@
+"""Batched analytics writer — keeps user and search bookkeeping off the reply path.
+
+Handlers enqueue a record and return immediately; every ``FLUSH_INTERVAL`` a
+background task writes what has queued up, ``FLUSH_SIZE`` rows at a time:
+first one multi-row user upsert, then one analytics INSERT plus one users
+UPDATE per chunk of searches. Users and searches are snapshotted together
+before any write, so a search is never counted ahead of its user's upsert;
+if that upsert fails, the user's searches are held back and retried with it.
+A user is refreshed at most once per ``USER_REFRESH_TTL``, and only marked
+as refreshed once the upsert succeeded.
+
+Usage:
+    analytics = get_analytics()
+    await analytics.start()                   # Start background flusher
+    analytics.record_user(...)                # Non-blocking
+    analytics.record_search(...)              # Non-blocking
+    await analytics.stop()                    # Flush the rest on shutdown
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+
+from src.database.repository import SearchAnalyticsRepository, UserRepository
+from src.utils.cache import MISSING, TTLCache
+
+FLUSH_INTERVAL = 0.5  # seconds a burst is allowed to accumulate
+FLUSH_SIZE = 100  # max rows per write
+QUEUE_MAX = 10_000  # drop (with a warning) rather than grow without bound
+USER_REFRESH_TTL = 300  # seconds; profile data rarely changes between messages
+
+
+class AnalyticsBuffer:
+    """Queue user upserts and search analytics, write them in batches."""
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=QUEUE_MAX)
+        self._users: Dict[int, Dict[str, Any]] = {}  # keyed by id: one upsert row per user
+        self._seen: TTLCache[bool] = TTLCache(maxsize=10_000, ttl=USER_REFRESH_TTL)  # upserted recently
+        self._held: List[Dict[str, Any]] = []  # searches waiting on a failed user upsert
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None  # type: ignore[type-arg]
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flusher; its last pass writes whatever is still queued."""
+        self._stopping.set()
+        if self._task:
+            await self._task
+        else:
+            await self._flush()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def record_user(
+        self,
+        telegram_id: int,
+        username: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str],
+        language_code: Optional[str],
+    ) -> None:
+        """Non-blocking: create/refresh this user on the next flush, unless refreshed recently."""
+        if self._seen.get(telegram_id) is not MISSING:
+            return
+        self._users[telegram_id] = dict(
+            telegram_id=telegram_id,
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            language_code=language_code,
+        )
+
+    def record_search(
+        self,
+        user_id: int,
+        query_text: str,
+        results_count: int,
+        response_time_ms: int,
+        result_listing_ids: List[int],
+    ) -> None:
+        """Non-blocking enqueue of one search."""
+        try:
+            self._queue.put_nowait(dict(
+                user_id=user_id,
+                query_text=query_text,
+                results_count=results_count,
+                response_time_ms=response_time_ms,
+                result_listing_ids=result_listing_ids,
+                searched_at=datetime.utcnow(),
+            ))
+        except asyncio.QueueFull:
+            logger.warning("Analytics queue full — dropping search record")
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await SearchAnalyticsRepository.record_many(rows)
+            await UserRepository.increment_searches_many(Counter(r["user_id"] for r in rows))
+        except Exception as e:
+            logger.error(f"Analytics flush failed ({len(rows)} rows): {e}")
+
+    async def _write_users(self, rows: List[Dict[str, Any]]) -> Set[int]:
+        """Upsert *rows*; return the ids whose upsert failed (re-queued for the next flush)."""
+        failed: Set[int] = set()
+        for i in range(0, len(rows), FLUSH_SIZE):
+            chunk = rows[i:i + FLUSH_SIZE]
+            try:
+                await UserRepository.upsert_many(chunk)
+            except Exception as e:
+                logger.error(f"User upsert failed ({len(chunk)} rows): {e}")
+                for row in chunk:  # retry next flush, unless a newer record is already queued
+                    self._users.setdefault(row["telegram_id"], row)
+                    failed.add(row["telegram_id"])
+                continue
+            for row in chunk:
+                self._seen.set(row["telegram_id"], True)
+        return failed
+
+    async def _flush(self) -> None:
+        # Snapshot both before the first await: anything recorded during the
+        # writes below belongs to the next flush, users and searches alike
+        users, self._users = list(self._users.values()), {}
+        searches, self._held = self._held, []
+        searches += [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        failed = await self._write_users(users) if users else set()
+        if failed:
+            # Their search counts would update no row yet; retry with the users
+            self._held = [r for r in searches if r["user_id"] in failed][-QUEUE_MAX:]
+            searches = [r for r in searches if r["user_id"] not in failed]
+        for i in range(0, len(searches), FLUSH_SIZE):
+            await self._write(searches[i:i + FLUSH_SIZE])
+
+    async def _flush_loop(self) -> None:
+        # stop() only sets the event: a pass in progress always completes, and
+        # the final one below runs after it, never alongside
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush()
+        await self._flush()  # whatever was recorded while the last pass ran
+
+
+_instance: Optional[AnalyticsBuffer] = None
+
+
+def get_analytics() -> AnalyticsBuffer:
+    global _instance
+    if _instance is None:
+        _instance = AnalyticsBuffer()
+    return _instance
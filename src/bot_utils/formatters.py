@@ -1,12 +1,20 @@
 """Message formatting utilities for bot responses."""
 
-from typing import Any, Dict, List
+import re
+from html import escape, unescape
+from typing import Any, Dict, Optional
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from src.i18n import get_i18n
 
 i18n = get_i18n()
 
+TELEGRAM_MAX_MESSAGE = 4096
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+RESULT_TEMPLATE = "<b>{index}.</b> {emoji} {pct}% match\n{body}\n🔗 <a href='{link}'>Original message</a>"
+
 
 def _truncate(text: str, max_len: int = 300) -> str:
     return text if len(text) <= max_len else text[: max_len - 3] + "..."
@@ -84,34 +92,40 @@ def format_search_header(lang: str, total: int, query: str, ms: int) -> str:
     )
 
 
+def result_link(result: Dict[str, Any]) -> Optional[str]:
+    """t.me link to the original post of a search result, or None."""
+    channel = result.get("source_channel", "")
+    msg_id = result.get("source_message_id")
+    if not channel or not msg_id:
+        return None
+    return f"https://t.me/{channel.lstrip('@')}/{msg_id}"
+
+
 def format_result_message(index: int, result: Dict[str, Any]) -> str:
     """Format a single search result for Telegram.
 
     Simple format: number + match % + raw text + link to original.
     """
-    channel = result.get("source_channel", "")
-    msg_id = result.get("source_message_id")
     raw_text = result.get("raw_text", "")
     similarity = result.get("similarity_score", 0)
 
-    if not channel or not msg_id:
+    link = result_link(result)
+    if not link:
         return ""
 
-    link = f"https://t.me/{channel.lstrip('@')}/{msg_id}"
     pct = int(similarity * 100)
     emoji = "🟢" if pct >= 80 else "🟡" if pct >= 60 else "🟠"
-    preview = _truncate(raw_text, 600)
+    return RESULT_TEMPLATE.format(index=index, emoji=emoji, pct=pct, body=esc_html(_truncate(raw_text, 600)), link=link)
 
-    return (
-        f"<b>{index}.</b> {emoji} {pct}% match\n"
-        f"{esc_html(preview)}\n"
-        f"🔗 <a href='{link}'>Original message</a>"
-    )
+
+def message_length(html_text: str) -> int:
+    """Length Telegram checks against TELEGRAM_MAX_MESSAGE: UTF-16 units of the parsed text."""
+    return len(unescape(_HTML_TAG.sub("", html_text)).encode("utf-16-le")) // 2
 
 
 def esc_html(text: str) -> str:
-    """Escape HTML special characters."""
-    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    """Escape HTML special characters (quotes are safe in Telegram message text)."""
+    return escape(text, quote=False)
 
 
 def format_valuation_result(query: str, data: Dict[str, Any]) -> str:
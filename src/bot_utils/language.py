@@ -1,31 +1,31 @@
 """Per-user language preference management — DB-backed with in-memory cache."""
 
-from typing import Dict, Optional
+from typing import Optional
 from src.i18n import get_i18n
 from src.database.repository import UserRepository
+from src.utils.cache import MISSING, TTLCache
 
 _i18n = get_i18n()
-_cache: Dict[int, str] = {}  # in-memory cache, populated from DB on first access
+# user_id → saved preference, or None for "no preference" (so those users skip the DB too)
+_cache: TTLCache[Optional[str]] = TTLCache(maxsize=10_000, ttl=3600)
 
 SUPPORTED = ("uz", "ru", "en")
 
 
 async def get_user_language(user_id: int, telegram_lang: Optional[str] = None) -> str:
     """Return saved preference for *user_id*, else detect from Telegram."""
-    if user_id in _cache:
-        return _cache[user_id]
-    # Try DB
-    db_pref = await UserRepository.get_preferred_language(user_id)
-    if db_pref and db_pref in SUPPORTED:
-        _cache[user_id] = db_pref
-        return db_pref
-    return _i18n.detect_language(telegram_lang)
+    pref = _cache.get(user_id)
+    if pref is MISSING:
+        db_pref = await UserRepository.get_preferred_language(user_id)
+        pref = db_pref if db_pref in SUPPORTED else None
+        _cache.set(user_id, pref)
+    return pref or _i18n.detect_language(telegram_lang)
 
 
 async def set_user_language(user_id: int, lang_code: str) -> bool:
     if lang_code not in SUPPORTED:
         return False
-    _cache[user_id] = lang_code
+    _cache.set(user_id, lang_code)
     await UserRepository.set_preferred_language(user_id, lang_code)
     return True
 
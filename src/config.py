@@ -1,7 +1,7 @@
 """Configuration management — loads and validates .env using Pydantic."""
 
 from pathlib import Path
-from typing import List, Optional
+from typing import FrozenSet, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,6 +24,7 @@ class TelegramConfig(BaseSettings):
 class OpenAIConfig(BaseSettings):
     api_key: str = Field(min_length=20)
     model: str = "gpt-4o-mini"
+    max_concurrency: int = 8  # in-flight chat completions per process
 
     @field_validator("api_key")
     @classmethod
@@ -41,13 +42,14 @@ class DatabaseConfig(BaseSettings):
     name: str = "tele_google"
     user: str = "postgres"
     password: str
+    driver: str = "asyncpg"  # SQLAlchemy async dialect, e.g. "psqlpy" (pip install psqlpy-sqlalchemy)
 
     model_config = SettingsConfigDict(env_prefix="DB_", env_file=".env", extra="ignore")
 
 
 class BotConfig(BaseSettings):
     token: str
-    admin_user_ids: List[int] = Field(default_factory=list)
+    admin_user_ids: FrozenSet[int] = Field(default_factory=frozenset)  # O(1) membership per admin command
     log_channel_id: Optional[int] = None
 
     model_config = SettingsConfigDict(env_prefix="BOT_", env_file=".env", extra="ignore")
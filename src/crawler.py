@@ -7,11 +7,12 @@ Watches channels.txt for hot-reload every 30 s.
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from loguru import logger
 from sqlalchemy.exc import IntegrityError
 from telethon import TelegramClient, events
+from telethon.errors import FloodWaitError
 from telethon.tl.functions.channels import JoinChannelRequest
 from telethon.tl.types import Message as TelegramMessage
 
@@ -21,10 +22,18 @@ from src.database.connection import init_db
 from src.database.repository import ChannelRepository, ListingRepository, SessionRepository
 from src.embeddings import get_embedding_generator
 from src.notifier import get_notifier
+from src.openai_client import close_openai_client
 from src.search_engine import get_search_engine
 from src.utils.channels import load_channels, get_file_mtime
+from src.utils.rate_limiter import RateLimiter
 
 SESSIONS_DIR = Path("data/sessions")
+# Telegram requests/sec (history pages, entity lookups) across all concurrent
+# backfills; stays well under the point where GetHistory starts FloodWaits
+BACKFILL_REQUEST_RATE = 3
+BACKFILL_PAGE_SIZE = 100  # messages per GetHistory request (Telegram's maximum)
+BACKFILL_BATCH_SIZE = 50  # listings per embeddings call + INSERT during backfill
+CLIENT_INIT_CONCURRENCY = 8  # Telethon sessions connected in parallel at startup
 
 
 class TelegramCrawler:
@@ -36,6 +45,8 @@ class TelegramCrawler:
         self.ai_parser = get_ai_parser()
         self.embedding_gen = get_embedding_generator()
         self._channels_mtime = 0.0
+        self._backfill_limiter = RateLimiter(BACKFILL_REQUEST_RATE)
+        self._prompt_lock = asyncio.Lock()
         SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
 
     # ------------------------------------------------------------------
@@ -54,7 +65,8 @@ class TelegramCrawler:
                     f"Session '{session_path}' is not authorized and stdin is not a TTY. "
                     "Use /auth command from the bot, or run the crawler interactively to authenticate."
                 )
-            await client.start(phone=phone)  # type: ignore[misc]
+            async with self._prompt_lock:  # one interactive code prompt at a time
+                await client.start(phone=phone)  # type: ignore[misc]
         return client
 
     async def initialize_clients(self) -> None:
@@ -70,12 +82,17 @@ class TelegramCrawler:
             )
             self.clients.append(client)
         else:
-            for s in db_sessions:
-                client = await self._auth_client(
-                    str(SESSIONS_DIR / s.session_name),
-                    s.api_id, s.api_hash, s.phone_number,  # type: ignore[arg-type]
-                )
-                self.clients.append(client)
+            # Connect sessions concurrently; the semaphore keeps Telegram's auth endpoint happy
+            sem = asyncio.Semaphore(CLIENT_INIT_CONCURRENCY)
+
+            async def _init_one(s: Any) -> TelegramClient:
+                async with sem:
+                    return await self._auth_client(
+                        str(SESSIONS_DIR / s.session_name),
+                        s.api_id, s.api_hash, s.phone_number,  # type: ignore[arg-type]
+                    )
+
+            self.clients.extend(await asyncio.gather(*[_init_one(s) for s in db_sessions]))
 
         logger.info(f"Active Telethon clients: {len(self.clients)}")
 
@@ -149,8 +166,7 @@ class TelegramCrawler:
     # Message processing pipeline
     # ------------------------------------------------------------------
 
-    async def _resolve_channel_id(self, event: events.NewMessage.Event) -> Optional[str]:
-        chat = await event.get_chat()
+    def _channel_id_for(self, chat: Any) -> Optional[str]:
         if not chat:
             return None
         # Prefer our own mapping (always stores @username from channels.txt)
@@ -163,6 +179,90 @@ class TelegramCrawler:
             return f"@{u}" if not u.startswith("@") else u
         return str(chat_id) if chat_id else None
 
+    async def _resolve_channel_id(self, event: events.NewMessage.Event) -> Optional[str]:
+        return self._channel_id_for(await event.get_chat())
+
+    async def _classify(self, raw_text: str) -> Optional[Dict[str, Any]]:
+        """AI classification; None (and a skip metric) if the text is not a listing."""
+        result = await self.ai_parser.classify_and_extract(raw_text)
+        if result is None:
+            get_notifier().count("messages_skipped")
+        return result
+
+    @staticmethod
+    def _build_listing(
+        channel_id: str, message: TelegramMessage, raw_text: str,
+        result: Dict[str, Any], embedding: List[float],
+    ) -> Dict[str, Any]:
+        """Assemble ``ListingRepository.create`` kwargs from a message and its AI result."""
+        channel_clean = channel_id.lstrip("@") if channel_id.startswith("@") else channel_id
+        return dict(
+            source_channel=channel_id,
+            source_message_id=message.id,
+            raw_text=raw_text,
+            has_media=bool(message.media),
+            embedding=embedding,
+            created_at=message.date.replace(tzinfo=None) if message.date else datetime.utcnow(),
+            metadata=result["metadata"],
+            message_link=f"https://t.me/{channel_clean}/{message.id}",
+            classification_confidence=result["confidence"],
+            processing_time_ms=result["processing_time_ms"],
+            raw_ai_response=result["raw_response"],
+        )
+
+    async def _on_indexed(self, listing_id: int, fields: Dict[str, Any]) -> None:
+        """Post-insert side effects: log, notify, deal detection."""
+        notifier = get_notifier()
+        channel_id = fields["source_channel"]
+        metadata = fields["metadata"]
+        confidence = fields["classification_confidence"]
+        processing_time_ms = fields["processing_time_ms"]
+        embedding = fields["embedding"]
+
+        title = metadata.get("title", "?")
+        price_info = f" | ${metadata.get('price', '?')}" if metadata.get("price") else ""
+        # Per-message hot path: pass args so loguru formats only if a sink accepts the level
+        logger.success(
+            "Indexed message {} from {}{} ({:.0%} conf, {}ms)",
+            fields["source_message_id"], channel_id, price_info, confidence, processing_time_ms,
+        )
+
+        await notifier.listing(
+            channel=channel_id,
+            title=title,
+            price=metadata.get("price"),
+            currency=metadata.get("currency"),
+            category=metadata.get("category"),
+            confidence=confidence,
+            processing_time_ms=processing_time_ms,
+            message_link=fields["message_link"],
+            metadata=metadata,
+        )
+
+        # Deal detection — if listing has price + currency, compare to market
+        listing_price = metadata.get("price")
+        listing_currency = metadata.get("currency")
+        if listing_price and listing_currency and embedding:
+            try:
+                deal = await get_search_engine().evaluate_deal(
+                    embedding=embedding,
+                    price=float(listing_price),
+                    currency=listing_currency,
+                )
+                if deal:
+                    await ListingRepository.update_deal_score(listing_id, deal["deviation"])
+                    if deal["is_deal"]:
+                        await notifier.deal(
+                            title=title,
+                            price=float(listing_price),
+                            currency=listing_currency,
+                            median=deal["median_price"],
+                            deviation=deal["deviation"],
+                        )
+                        logger.info(f"🔥 Deal detected: {title} — {abs(deal['deviation'])*100:.0f}% below median")
+            except Exception as e:
+                logger.warning(f"Deal evaluation failed: {e}")
+
     async def process_message(self, event: events.NewMessage.Event) -> None:
         """text → duplicate check → is_listing? → embed → store"""
         message: TelegramMessage = event.message
@@ -181,84 +281,23 @@ class TelegramCrawler:
             return
 
         try:
-            result = await self.ai_parser.classify_and_extract(raw_text)
+            result = await self._classify(raw_text)
             if result is None:
-                notifier.count("messages_skipped")
                 return
 
-            metadata = result["metadata"]
-            confidence = result["confidence"]
-            raw_ai_response = result["raw_response"]
-            processing_time_ms = result["processing_time_ms"]
-
             embedding = await self.embedding_gen.generate(raw_text)
             if not embedding:
                 return
 
-            # Build message link
-            channel_clean = channel_id.lstrip("@") if channel_id.startswith("@") else channel_id
-            message_link = f"https://t.me/{channel_clean}/{message.id}"
-
-            msg_date = message.date.replace(tzinfo=None) if message.date else datetime.utcnow()
+            fields = self._build_listing(channel_id, message, raw_text, result, embedding)
             try:
-                listing = await ListingRepository.create(
-                    source_channel=channel_id,
-                    source_message_id=message.id,
-                    raw_text=raw_text,
-                    has_media=bool(message.media),
-                    embedding=embedding,
-                    created_at=msg_date,
-                    metadata=metadata,
-                    message_link=message_link,
-                    classification_confidence=confidence,
-                    processing_time_ms=processing_time_ms,
-                    raw_ai_response=raw_ai_response,
-                )
+                listing = await ListingRepository.create(**fields)
             except IntegrityError:
                 # Race condition: another process already indexed this message
-                logger.debug(f"Duplicate message {message.id} from {channel_id} — skipping")
+                logger.debug("Duplicate message {} from {} — skipping", message.id, channel_id)
                 return
             await ChannelRepository.update_stats(channel_id, message.id)
-
-            title = metadata.get("title", "?")  # type: ignore[union-attr]
-            price_info = f" | ${metadata.get('price', '?')}" if metadata.get("price") else ""
-            logger.success(f"Indexed message {message.id} from {channel_id}{price_info} ({confidence:.0%} conf, {processing_time_ms}ms)")
-
-            await notifier.listing(
-                channel=channel_id,
-                title=title,
-                price=metadata.get("price"),  # type: ignore[union-attr]
-                currency=metadata.get("currency"),  # type: ignore[union-attr]
-                category=metadata.get("category"),  # type: ignore[union-attr]
-                confidence=confidence,
-                processing_time_ms=processing_time_ms,
-                message_link=message_link,
-                metadata=metadata,
-            )
-
-            # Deal detection — if listing has price + currency, compare to market
-            listing_price = metadata.get("price")  # type: ignore[union-attr]
-            listing_currency = metadata.get("currency")  # type: ignore[union-attr]
-            if listing_price and listing_currency and embedding:
-                try:
-                    deal = await get_search_engine().evaluate_deal(
-                        embedding=embedding,
-                        price=float(listing_price),
-                        currency=listing_currency,
-                    )
-                    if deal:
-                        await ListingRepository.update_deal_score(listing.id, deal["deviation"])  # type: ignore[arg-type]
-                        if deal["is_deal"]:
-                            await notifier.deal(
-                                title=title,
-                                price=float(listing_price),
-                                currency=listing_currency,
-                                median=deal["median_price"],
-                                deviation=deal["deviation"],
-                            )
-                            logger.info(f"🔥 Deal detected: {title} — {abs(deal['deviation'])*100:.0f}% below median")
-                except Exception as e:
-                    logger.warning(f"Deal evaluation failed: {e}")
+            await self._on_indexed(listing.id, fields)  # type: ignore[arg-type]
 
         except Exception as e:
             logger.error(f"Failed to process message {message.id}: {e}", exc_info=True)
@@ -301,8 +340,80 @@ class TelegramCrawler:
     # Backfill
     # ------------------------------------------------------------------
 
-    async def backfill_channel(self, channel_username: str, limit: int = 100, min_id: int = 0) -> int:
-        """Fetch historical messages from a channel and index them."""
+    @staticmethod
+    async def _store_batch(channel_id: str, batch: List[Dict[str, Any]]) -> Dict[int, int]:
+        inserted = await ListingRepository.create_many(batch)
+        if inserted:
+            await ChannelRepository.update_stats(channel_id, max(inserted), count=len(inserted))
+        return inserted
+
+    async def _flush_backfill(
+        self, channel_id: str, pending: List[Tuple[TelegramMessage, str]],
+        results: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> int:
+        """Classify a batch concurrently, embed the listings in one call, store them in one INSERT.
+
+        *results* skips classification when verdicts are already known (Batch API).
+        Returns how many listings were new.
+        """
+        if not pending:
+            return 0
+        if results is None:
+            results = await self.ai_parser.classify_many([text for _, text in pending])
+        classified: List[Tuple[TelegramMessage, str, Dict[str, Any]]] = []
+        for (message, text), result in zip(pending, results):
+            if result is None:
+                get_notifier().count("messages_skipped")
+            else:
+                classified.append((message, text, result))
+        if not classified:
+            return 0
+        embeddings = await self.embedding_gen.generate_batch([text for _, text, _ in classified])
+        batch = [
+            self._build_listing(channel_id, message, text, result, embedding)
+            for (message, text, result), embedding in zip(classified, embeddings)
+            if embedding
+        ]
+        # Shielded so Ctrl-C mid-batch never leaves rows stored without their channel stats
+        store = asyncio.ensure_future(self._store_batch(channel_id, batch))
+        try:
+            inserted = await asyncio.shield(store)
+        except asyncio.CancelledError:
+            await store
+            raise
+        for fields in batch:
+            listing_id = inserted.get(fields["source_message_id"])
+            if listing_id is not None:
+                await self._on_indexed(listing_id, fields)
+        return len(inserted)
+
+    async def _classify_via_batch_api(
+        self, channel_id: str, pending: List[Tuple[TelegramMessage, str]],
+    ) -> int:
+        """Classify all of *pending* in one OpenAI Batch API job, then index in chunks."""
+        if not pending:
+            return 0
+        texts = [text for _, text in pending]
+        batch_id = await self.ai_parser.classify_batch_submit(texts)
+        logger.info(f"Submitted OpenAI batch {batch_id} ({len(texts)} messages from {channel_id})")
+        results = await self.ai_parser.classify_batch_collect(batch_id, texts)
+        indexed = 0
+        for i in range(0, len(pending), BACKFILL_BATCH_SIZE):
+            indexed += await self._flush_backfill(
+                channel_id, pending[i:i + BACKFILL_BATCH_SIZE], results[i:i + BACKFILL_BATCH_SIZE],
+            )
+        return indexed
+
+    async def backfill_channel(
+        self, channel_username: str, limit: int = 100, min_id: int = 0, use_batch_api: bool = False,
+    ) -> int:
+        """Fetch historical messages from a channel and index them.
+
+        New messages are collected in batches of ``BACKFILL_BATCH_SIZE``; each batch
+        is classified concurrently, then embedded and stored with one call each.
+        With *use_batch_api*, the whole channel is classified in one OpenAI Batch API
+        job instead (half price, may take hours).
+        """
         if not self.clients:
             return 0
 
@@ -311,25 +422,50 @@ class TelegramCrawler:
         logger.info(f"Backfilling {channel_username} (limit={limit}, min_id={min_id})")
 
         try:
-            entity = await client.get_entity(channel_username)  # type: ignore[arg-type]
-
-            class _FakeEvent:
-                """Lightweight adapter so process_message can handle backfill messages."""
-                def __init__(self, msg: TelegramMessage, chat: Any) -> None:
-                    self.message = msg
-                    self._chat = chat
-                async def get_chat(self) -> Any:
-                    return self._chat
-
-            async for message in client.iter_messages(entity, limit=limit, min_id=min_id):  # type: ignore[arg-type]
-                if message.message and message.message.strip():
+            async with self._backfill_limiter:
+                entity = await client.get_entity(channel_username)  # type: ignore[arg-type]
+            channel_id = self._channel_id_for(entity) or channel_username
+            notifier = get_notifier()
+            pending: List[Tuple[TelegramMessage, str]] = []
+
+            # Page by hand so every GetHistory request takes a limiter token;
+            # after a FloodWait the same page is simply requested again
+            offset_id = 0
+            remaining = limit
+            while remaining > 0:
+                try:
+                    async with self._backfill_limiter:
+                        page = await client.get_messages(  # type: ignore[arg-type]
+                            entity, limit=min(BACKFILL_PAGE_SIZE, remaining), min_id=min_id, offset_id=offset_id,
+                        )
+                except FloodWaitError as e:
+                    logger.warning(f"Flood wait {e.seconds}s while backfilling {channel_username}")
+                    await asyncio.sleep(e.seconds)
+                    continue
+                if not page:
+                    break
+                offset_id = page[-1].id
+                remaining -= len(page)
+
+                for message in page:
+                    raw_text = (message.message or "").strip()
+                    if not raw_text:
+                        continue
+                    notifier.count("messages_seen")
                     try:
-                        await self.process_message(_FakeEvent(message, entity))  # type: ignore[arg-type]
-                        indexed += 1
+                        if await ListingRepository.exists(channel_id, message.id):
+                            continue
+                        pending.append((message, raw_text))
                     except Exception as e:
                         logger.warning(f"Backfill skip message {message.id}: {e}")
-                    await asyncio.sleep(0.5)
-
+                    if len(pending) >= BACKFILL_BATCH_SIZE and not use_batch_api:
+                        indexed += await self._flush_backfill(channel_id, pending)
+                        pending = []
+
+            if use_batch_api:
+                indexed += await self._classify_via_batch_api(channel_id, pending)
+            else:
+                indexed += await self._flush_backfill(channel_id, pending)
             logger.success(f"Backfill done: {indexed} messages indexed from {channel_username}")
         except Exception as e:
             logger.error(f"Backfill failed: {e}", exc_info=True)
@@ -374,4 +510,5 @@ class TelegramCrawler:
     async def stop(self) -> None:
         for client in self.clients:
             await client.disconnect()  # type: ignore[misc]
+        await close_openai_client()
         logger.info("Crawler stopped")
@@ -1,9 +1,9 @@
 """Database package — public API."""
 
-from src.database.connection import init_db, close_db, get_session
+from src.database.connection import init_db, close_db, get_session, ping_db
 from src.database.models import TelegramSession, MonitoredChannel, Listing, SearchAnalytics, Base
 
 __all__ = [
-    "init_db", "close_db", "get_session",
+    "init_db", "close_db", "get_session", "ping_db",
     "TelegramSession", "MonitoredChannel", "Listing", "SearchAnalytics", "Base",
 ]
@@ -1,17 +1,28 @@
 """Async database connection management with SQLAlchemy."""
 
 from loguru import logger
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from src.config import get_config
 
+# asyncpg keeps prepared statements per pooled connection; sized for the hot
+# INSERT/SELECT shapes (search, analytics, upserts) to never be evicted
+STATEMENT_CACHE_SIZE = 1024  # asyncpg's own LRU (default 100)
+PREPARED_STATEMENT_CACHE_SIZE = 256  # SQLAlchemy's asyncpg-dialect LRU (default 100)
+
+# Per process (bot and crawler each have one). Every Postgres backend costs
+# several MB on the small host, so bursts are capped rather than absorbed.
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 5
+
 _engine = None
 _async_session_factory = None
 
 
 def get_database_url() -> str:
     db = get_config().database
-    return f"postgresql+asyncpg://{db.user}:{db.password}@{db.host}:{db.port}/{db.name}"
+    return f"postgresql+{db.driver}://{db.user}:{db.password}@{db.host}:{db.port}/{db.name}"
 
 
 async def init_db() -> None:
@@ -22,15 +33,21 @@ async def init_db() -> None:
         return
 
     database_url = get_database_url()
+    connect_args = {}
+    if get_config().database.driver == "asyncpg":
+        database_url += f"?prepared_statement_cache_size={PREPARED_STATEMENT_CACHE_SIZE}"
+        connect_args["statement_cache_size"] = STATEMENT_CACHE_SIZE
     logger.info(f"Connecting to database: {database_url.split('@')[1]}")
 
     _engine = create_async_engine(
         database_url,
         echo=False,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
         pool_pre_ping=True,
-        pool_recycle=3600,
+        pool_recycle=1800,
+        pool_timeout=30,
+        connect_args=connect_args,
     )
 
     _async_session_factory = async_sessionmaker(
@@ -41,6 +58,7 @@ async def init_db() -> None:
 
 
 async def close_db() -> None:
+    """Dispose the engine and its pooled connections. Call once at shutdown."""
     global _engine, _async_session_factory
     if _engine is None:
         return
@@ -50,7 +68,14 @@ async def close_db() -> None:
     logger.info("Database connections closed")
 
 
+async def ping_db() -> None:
+    """Run ``SELECT 1`` so a pooled connection is open before the first real query."""
+    async with get_session() as session:
+        await session.execute(text("SELECT 1"))
+
+
 def get_session() -> AsyncSession:
+    """New session on the shared pool. Keep it short-lived: query, then leave the block before slow I/O."""
     if _async_session_factory is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
     return _async_session_factory()
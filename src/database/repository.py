@@ -1,13 +1,47 @@
 """Repository layer — clean interface for all DB operations."""
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import func, select, update
+from sqlalchemy import bindparam, delete, func, select, text, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 
 from src.database.connection import get_session
 from src.database.models import MonitoredChannel, TelegramSession, Listing, User, SearchAnalytics
 
+# ---------------------------------------------------------------------------
+# Static statements — built once at import; only parameters bind per call
+# ---------------------------------------------------------------------------
+
+_COUNT_BY_CHANNELS = (
+    select(Listing.source_channel, func.count())
+    .where(Listing.source_channel.in_(bindparam("channels", expanding=True)))
+    .group_by(Listing.source_channel)
+    .order_by(func.count().desc())
+)
+_LISTING_SUMMARY = select(
+    func.count().label("total"),
+    func.count().filter(Listing.price.isnot(None)).label("with_price"),
+    func.count().filter(Listing.item_metadata.isnot(None)).label("with_meta"),
+    func.min(Listing.price).label("min_price"),
+    func.max(Listing.price).label("max_price"),
+    func.avg(Listing.price).label("avg_price"),
+).select_from(Listing)
+_category = Listing.item_metadata["category"].astext
+_has_meta = Listing.item_metadata.isnot(None)
+# One scan, three aggregations. has_meta is grouped alongside the category so
+# rows without metadata can be told apart from metadata lacking a category.
+_LISTING_BREAKDOWNS = select(
+    func.grouping(Listing.currency).label("by_currency"),
+    func.grouping(Listing.source_channel).label("by_channel"),
+    _has_meta.label("has_meta"),
+    _category.label("category"),
+    Listing.currency,
+    Listing.source_channel,
+    func.count().label("cnt"),
+).group_by(func.grouping_sets(tuple_(_has_meta, _category), Listing.currency, Listing.source_channel))
+_USER_COUNT = select(func.count()).select_from(User)
+_SEARCH_COUNT = select(func.count()).select_from(SearchAnalytics)
+
 
 class ChannelRepository:
     @staticmethod
@@ -19,32 +53,39 @@ class ChannelRepository:
             return list(result.scalars().all())
 
     @staticmethod
-    async def deactivate(username: str) -> bool:
+    async def remove(username: str) -> int:
+        """Deactivate *username* and delete its listings in one transaction; returns listings removed."""
         async with get_session() as session:
-            result = await session.execute(
+            await session.execute(
                 update(MonitoredChannel)
                 .where(MonitoredChannel.username == username)
                 .values(is_active=False)
             )
+            # Nothing is loaded in this session, so skip the ORM's evaluate pass
+            result = await session.execute(
+                delete(Listing)
+                .where(Listing.source_channel == username)
+                .execution_options(synchronize_session=False)
+            )
             await session.commit()
-            return bool(result.rowcount)
+            return result.rowcount or 0
 
     @staticmethod
-    async def update_stats(username: str, message_id: int) -> None:
-        """Upsert channel stats (insert on first encounter, increment otherwise)."""
+    async def update_stats(username: str, message_id: int, count: int = 1) -> None:
+        """Upsert channel stats (insert on first encounter, increment by *count* otherwise)."""
         async with get_session() as session:
             await session.execute(
                 insert(MonitoredChannel)
                 .values(
                     username=username,
-                    total_indexed=1,
+                    total_indexed=count,
                     last_message_id=message_id,
                     last_scraped_at=datetime.utcnow(),
                 )
                 .on_conflict_do_update(
                     index_elements=["username"],
                     set_=dict(
-                        total_indexed=MonitoredChannel.total_indexed + 1,
+                        total_indexed=MonitoredChannel.total_indexed + count,
                         last_message_id=message_id,
                         last_scraped_at=datetime.utcnow(),
                     ),
@@ -76,7 +117,7 @@ class ListingRepository:
             return result.scalar_one_or_none() is not None
 
     @staticmethod
-    async def create(
+    def _listing_values(
         source_channel: str,
         source_message_id: int,
         raw_text: str,
@@ -88,34 +129,75 @@ class ListingRepository:
         classification_confidence: Optional[float] = None,
         processing_time_ms: Optional[int] = None,
         raw_ai_response: Optional[str] = None,
-    ) -> Listing:
+    ) -> Dict[str, Any]:
+        """Map ``create`` arguments to Listing column values (price/currency denormalized from metadata)."""
         price = None
         currency = None
         if metadata:
             p = metadata.get("price")
             price = float(p) if p is not None else None
             currency = metadata.get("currency")
+        return dict(
+            source_channel=source_channel,
+            source_message_id=source_message_id,
+            raw_text=raw_text,
+            has_media=has_media,
+            embedding=embedding,
+            created_at=created_at or datetime.utcnow(),
+            item_metadata=metadata,
+            price=price,
+            currency=currency,
+            message_link=message_link,
+            classification_confidence=classification_confidence,
+            processing_time_ms=processing_time_ms,
+            raw_ai_response=raw_ai_response,
+        )
+
+    @staticmethod
+    async def create(
+        source_channel: str,
+        source_message_id: int,
+        raw_text: str,
+        has_media: bool,
+        embedding: List[float],
+        created_at: Optional[datetime] = None,
+        metadata: Optional[dict] = None,
+        message_link: Optional[str] = None,
+        classification_confidence: Optional[float] = None,
+        processing_time_ms: Optional[int] = None,
+        raw_ai_response: Optional[str] = None,
+    ) -> Listing:
         async with get_session() as session:
-            listing = Listing(
-                source_channel=source_channel,
-                source_message_id=source_message_id,
-                raw_text=raw_text,
-                has_media=has_media,
-                embedding=embedding,
-                created_at=created_at or datetime.utcnow(),
-                item_metadata=metadata,
-                price=price,
-                currency=currency,
-                message_link=message_link,
-                classification_confidence=classification_confidence,
-                processing_time_ms=processing_time_ms,
-                raw_ai_response=raw_ai_response,
-            )
+            listing = Listing(**ListingRepository._listing_values(
+                source_channel, source_message_id, raw_text, has_media, embedding,
+                created_at, metadata, message_link,
+                classification_confidence, processing_time_ms, raw_ai_response,
+            ))
             session.add(listing)
             await session.commit()
             await session.refresh(listing)
             return listing
 
+    @staticmethod
+    async def create_many(rows: List[Dict[str, Any]]) -> Dict[int, int]:
+        """Insert listings from one channel in a single multi-row statement.
+
+        Each row holds the keyword arguments of ``create``. Rows already indexed
+        (unique channel + message id) are skipped. Returns ``{source_message_id: listing_id}`` for the rows actually inserted.
+        """
+        if not rows:
+            return {}
+        values = [ListingRepository._listing_values(**r) for r in rows]
+        async with get_session() as session:
+            result = await session.execute(
+                insert(Listing)
+                .values(values)
+                .on_conflict_do_nothing(constraint="uq_listing_channel_message")
+                .returning(Listing.source_message_id, Listing.id)
+            )
+            await session.commit()
+            return {msg_id: listing_id for msg_id, listing_id in result.all()}
+
     @staticmethod
     async def update_deal_score(listing_id: int, deal_score: float) -> None:
         async with get_session() as session:
@@ -126,93 +208,134 @@ class ListingRepository:
             )
             await session.commit()
 
+    @staticmethod
+    async def truncate() -> None:
+        """Delete all listings and reset the id sequence.
+
+        CASCADE is only added when another table has a foreign key to listings.
+        The commit skips the WAL flush wait — re-running after a crash is harmless.
+        """
+        async with get_session() as session:
+            referenced = (await session.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_constraint "
+                "WHERE contype = 'f' AND confrelid = 'listings'::regclass)"
+            ))).scalar()
+            await session.execute(text("SET LOCAL synchronous_commit = OFF"))
+            cascade = " CASCADE" if referenced else ""
+            await session.execute(text(f"TRUNCATE TABLE listings RESTART IDENTITY{cascade}"))
+            await session.commit()
+
+    @staticmethod
+    async def count_by_channels(channels: List[str]) -> Dict[str, int]:
+        """Listing count per channel in one GROUP BY, largest first; channels with none trail as 0."""
+        async with get_session() as session:
+            rows = (await session.execute(_COUNT_BY_CHANNELS, {"channels": channels})).all()
+        counts = {ch: n for ch, n in rows}
+        counts.update({ch: 0 for ch in channels if ch not in counts})
+        return counts
+
     @staticmethod
     async def get_counts() -> Dict[str, int]:
-        """Return total listings and count with price."""
+        """Return total listings and count with price (shares the /stats summary scan)."""
         async with get_session() as session:
-            total = (await session.execute(
-                select(func.count()).select_from(Listing)
-            )).scalar() or 0
-            with_price = (await session.execute(
-                select(func.count()).select_from(Listing).where(Listing.price.isnot(None))
-            )).scalar() or 0
-        return {"total": total, "with_price": with_price}
+            row = (await session.execute(_LISTING_SUMMARY)).one()
+        return {"total": row.total, "with_price": row.with_price}
+
+    @staticmethod
+    async def get_summary() -> Dict[str, Any]:
+        """Totals, coverage and price range for /stats in one scan (FILTER aggregates)."""
+        async with get_session() as session:
+            row = (await session.execute(_LISTING_SUMMARY)).one()
+        return dict(row._mapping)
+
+    @staticmethod
+    async def get_breakdowns() -> Dict[str, List[Tuple[Optional[str], int]]]:
+        """Top categories, currencies and channels by listing count, from one GROUPING SETS scan."""
+        async with get_session() as session:
+            rows = (await session.execute(_LISTING_BREAKDOWNS)).all()
+
+        breakdowns: Dict[str, List[Tuple[Optional[str], int]]] = {"categories": [], "currencies": [], "channels": []}
+        # grouping() is 0 for the set a row belongs to
+        for r in sorted(rows, key=lambda r: r.cnt, reverse=True):
+            if r.by_currency == 0:
+                if r.currency is not None:
+                    breakdowns["currencies"].append((r.currency, r.cnt))
+            elif r.by_channel == 0:
+                breakdowns["channels"].append((r.source_channel, r.cnt))
+            elif r.has_meta:
+                breakdowns["categories"].append((r.category, r.cnt))
+        breakdowns["categories"] = breakdowns["categories"][:10]
+        return breakdowns
 
 
 class SearchAnalyticsRepository:
     """Track search queries for analytics."""
 
     @staticmethod
-    async def record(
-        user_id: int,
-        query_text: str,
-        results_count: int,
-        response_time_ms: int,
-        result_listing_ids: Optional[List[int]] = None,
-    ) -> None:
-        async with get_session() as session:
-            session.add(SearchAnalytics(
-                user_id=user_id,
-                query_text=query_text,
-                results_count=results_count,
-                response_time_ms=response_time_ms,
-                result_listing_ids=result_listing_ids,
-                searched_at=datetime.utcnow(),
-            ))
+    async def record_many(rows: List[Dict[str, Any]]) -> None:
+        """Insert many searches in one executemany. Keys are ``SearchAnalytics`` columns."""
+        if not rows:
+            return
+        async with get_session() as session:
+            await session.execute(insert(SearchAnalytics), rows)
             await session.commit()
 
+    @staticmethod
+    async def count() -> int:
+        async with get_session() as session:
+            return (await session.execute(_SEARCH_COUNT)).scalar() or 0
+
 
 class UserRepository:
     """Manage bot users for analytics and preference persistence."""
 
     @staticmethod
-    async def upsert_from_message(
-        telegram_id: int,
-        username: Optional[str] = None,
-        first_name: Optional[str] = None,
-        last_name: Optional[str] = None,
-        language_code: Optional[str] = None,
-    ) -> None:
-        """Create or update user on every interaction."""
+    async def upsert_many(rows: List[Dict[str, Any]]) -> None:
+        """Create or refresh many users in one multi-row INSERT … ON CONFLICT.
+
+        Each row has ``telegram_id``, ``username``, ``first_name``, ``last_name``,
+        ``language_code``; ids must be unique within *rows*.
+        """
+        if not rows:
+            return
+        now = datetime.utcnow()
+        stmt = insert(User).values([
+            {**r, "first_seen_at": now, "last_active_at": now, "total_searches": 0} for r in rows
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["telegram_id"],
+            set_={
+                col: stmt.excluded[col]
+                for col in ("username", "first_name", "last_name", "language_code", "last_active_at")
+            },
+        )
         async with get_session() as session:
-            await session.execute(
-                insert(User)
-                .values(
-                    telegram_id=telegram_id,
-                    username=username,
-                    first_name=first_name,
-                    last_name=last_name,
-                    language_code=language_code,
-                    first_seen_at=datetime.utcnow(),
-                    last_active_at=datetime.utcnow(),
-                    total_searches=0,
-                )
-                .on_conflict_do_update(
-                    index_elements=["telegram_id"],
-                    set_=dict(
-                        username=username,
-                        first_name=first_name,
-                        last_name=last_name,
-                        language_code=language_code,
-                        last_active_at=datetime.utcnow(),
-                    ),
-                )
-            )
+            await session.execute(stmt)
             await session.commit()
 
     @staticmethod
-    async def increment_searches(telegram_id: int) -> None:
+    async def increment_searches_many(counts: Dict[int, int]) -> None:
+        """Add ``counts[telegram_id]`` to each user's search total in one executemany."""
+        if not counts:
+            return
+        users = User.__table__
         async with get_session() as session:
             await session.execute(
-                update(User)
-                .where(User.telegram_id == telegram_id)
+                update(users)
+                .where(users.c.telegram_id == bindparam("tid"))
                 .values(
-                    total_searches=User.total_searches + 1,
+                    total_searches=users.c.total_searches + bindparam("n"),
                     last_active_at=datetime.utcnow(),
-                )
+                ),
+                [{"tid": tid, "n": n} for tid, n in counts.items()],
             )
             await session.commit()
 
+    @staticmethod
+    async def count() -> int:
+        async with get_session() as session:
+            return (await session.execute(_USER_COUNT)).scalar() or 0
+
     @staticmethod
     async def get_preferred_language(telegram_id: int) -> Optional[str]:
         async with get_session() as session:
@@ -223,10 +346,21 @@ class UserRepository:
 
     @staticmethod
     async def set_preferred_language(telegram_id: int, lang: str) -> None:
+        # Upsert: the user row may still be queued in the analytics buffer
+        now = datetime.utcnow()
         async with get_session() as session:
             await session.execute(
-                update(User)
-                .where(User.telegram_id == telegram_id)
-                .values(preferred_language=lang, last_active_at=datetime.utcnow())
+                insert(User)
+                .values(
+                    telegram_id=telegram_id,
+                    preferred_language=lang,
+                    first_seen_at=now,
+                    last_active_at=now,
+                    total_searches=0,
+                )
+                .on_conflict_do_update(
+                    index_elements=["telegram_id"],
+                    set_=dict(preferred_language=lang, last_active_at=now),
+                )
             )
             await session.commit()
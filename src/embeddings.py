@@ -2,9 +2,9 @@
 
 from typing import List, Optional
 from loguru import logger
-from openai import AsyncOpenAI, OpenAIError
+from openai import OpenAIError
 
-from src.config import get_config
+from src.openai_client import get_openai_client
 
 MODEL = "text-embedding-3-small"
 DIMENSIONS = 1536
@@ -12,7 +12,7 @@ DIMENSIONS = 1536
 
 class EmbeddingGenerator:
     def __init__(self) -> None:
-        self.client = AsyncOpenAI(api_key=get_config().openai.api_key)
+        self.client = get_openai_client()
 
     async def generate(self, text: str) -> Optional[List[float]]:
         """Return a 1536-dim embedding vector for *text*, or None on failure."""
@@ -30,6 +30,24 @@ class EmbeddingGenerator:
             logger.error(f"Embedding error: {e}")
             return None
 
+    async def generate_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed many texts in one API call. Result is aligned with *texts* (None = failed/empty)."""
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        positions = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not positions:
+            return vectors
+        try:
+            response = await self.client.embeddings.create(
+                model=MODEL, input=[texts[i] for i in positions], dimensions=DIMENSIONS
+            )
+            for item in response.data:
+                vectors[positions[item.index]] = item.embedding
+        except OpenAIError as e:
+            logger.error(f"Embedding API error: {e}")
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+        return vectors
+
 
 _instance: Optional[EmbeddingGenerator] = None
 
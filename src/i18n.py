@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from loguru import logger
 
 
@@ -14,6 +14,8 @@ class I18n:
     def __init__(self, locales_dir: str = "src/locales", default_lang: str = "en"):
         self.default_lang = default_lang
         self.translations: Dict[str, Dict[str, Any]] = {}
+        # (lang, dotted key) → node, built once at load so lookups are a single dict hit
+        self._flat: Dict[Tuple[str, str], Any] = {}
         locales = Path(locales_dir)
         if not locales.exists():
             logger.warning(f"Locales directory not found: {locales}")
@@ -21,37 +23,38 @@ class I18n:
         for f in locales.glob("*.json"):
             try:
                 self.translations[f.stem] = json.loads(f.read_text("utf-8"))
+                self._flatten(f.stem, "", self.translations[f.stem])
                 logger.info(f"Loaded locale: {f.stem}")
             except Exception as e:
                 logger.error(f"Failed to load locale {f.stem}: {e}")
 
+    def _flatten(self, lang: str, prefix: str, node: Dict[str, Any]) -> None:
+        for name, value in node.items():
+            key = f"{prefix}{name}"
+            self._flat[(lang, key)] = value
+            if isinstance(value, dict):
+                self._flatten(lang, f"{key}.", value)
+
+    def _resolve(self, key: str, lang: Optional[str]) -> Any:
+        """Look up *key* in *lang*, falling back to the default language; None if absent."""
+        node = self._flat.get((lang, key)) if lang else None
+        return node if node is not None else self._flat.get((self.default_lang, key))
+
     def get(self, key: str, lang: Optional[str] = None, **kwargs) -> str:
         """Resolve *key* (dot-separated path) in *lang*'s translations."""
-        lang = lang if lang in self.translations else self.default_lang
-        node: Any = self.translations.get(lang, {})
-        for part in key.split("."):
-            if isinstance(node, dict):
-                node = node.get(part)
-            else:
-                return key
-            if node is None:
-                return key
+        node = self._resolve(key, lang)
+        if node is None:
+            return key
         if isinstance(node, str) and kwargs:
             try:
                 return node.format(**kwargs)
             except KeyError:
                 return node
-        return str(node) if node is not None else key
+        return str(node)
 
     def get_list(self, key: str, lang: Optional[str] = None) -> list:
         """Return a list value at *key*, or ``[]``."""
-        lang = lang if lang in self.translations else self.default_lang
-        node: Any = self.translations.get(lang, {})
-        for part in key.split("."):
-            if isinstance(node, dict):
-                node = node.get(part)
-            else:
-                return []
+        node = self._resolve(key, lang)
         return node if isinstance(node, list) else []
 
     def detect_language(self, user_lang_code: Optional[str]) -> str:
@@ -0,0 +1,49 @@
+"""Shared OpenAI client — one pooled HTTP connection set for chat completions and embeddings."""
+
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from src.config import get_config
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+KEEPALIVE_EXPIRY = 60.0  # seconds an idle TLS connection is kept for reuse
+# The SDK retries 408/409/429/5xx and connection errors with jittered
+# exponential backoff; one more attempt than its default of 2.
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 20.0  # per attempt, so a stuck call is retried instead of hanging
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Lazy singleton ``AsyncOpenAI`` with an explicitly sized keep-alive pool."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=get_config().openai.api_key,
+            max_retries=MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=5.0),
+            ),
+        )
+    return _client
+
+
+async def warmup_openai_client() -> None:
+    """Cheap authenticated GET so the pool holds a TLS connection before the first real call."""
+    await get_openai_client().models.list()
+
+
+async def close_openai_client() -> None:
+    """Close the pooled connections. Call once at shutdown."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,34 +1,69 @@
-"""Search pipeline: embed query → pgvector top 50 → AI rerank → top N results.
+"""Search pipeline: embed query → pgvector top 20 → AI rerank → top N results.
 Deal detection: embed listing → pgvector neighbors → median price comparison.
 Valuation: embed query → find priced neighbors → return price statistics.
 """
 
 import statistics
+from array import array
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from loguru import logger
-from sqlalchemy import select, text
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import cast, select, text
 
 from src.database.models import Listing
-
-MAX_LISTING_AGE_DAYS = 30
 from src.database import get_session
 from src.embeddings import get_embedding_generator
 from src.ai_parser import get_ai_parser
+from src.utils.cache import MISSING, TTLCache, text_key
+
+MAX_LISTING_AGE_DAYS = 30
+# HNSW candidate list size per scan pass. The age filter is applied after the
+# index scan; iterative scans (see _find_similar) keep going until it is met.
+HNSW_EF_SEARCH = 100
+# Candidates handed to the LLM reranker. pgvector already orders them by
+# cosine similarity, so the tail past this rarely changes the final top N.
+RERANK_CANDIDATES = 20
+# Short-lived per-query candidate cache: repeat searches skip embed + pgvector
+CANDIDATE_CACHE_SIZE = 256
+CANDIDATE_CACHE_TTL = 60
+# Query embeddings outlive the candidate cache (the vector for a text never
+# changes). Stored as float32 arrays: ~6KB each instead of ~50KB as a list.
+EMBEDDING_CACHE_SIZE = 512
+EMBEDDING_CACHE_TTL = 600
 
 
 class SearchEngine:
     def __init__(self) -> None:
         self.embedding_gen = get_embedding_generator()
         self.ai_parser = get_ai_parser()
+        self._candidate_cache: TTLCache[List[Dict[str, Any]]] = TTLCache(CANDIDATE_CACHE_SIZE, CANDIDATE_CACHE_TTL)
+        self._embedding_cache: TTLCache[array] = TTLCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL)
+
+    def clear_cache(self) -> None:
+        """Drop cached candidates after the listing set changed (embeddings stay valid)."""
+        self._candidate_cache.clear()
+
+    async def _embed_query(self, query_text: str, key: str) -> Optional[List[float]]:
+        """Embed a user query, reusing the vector for repeated (normalized) queries."""
+        cached = self._embedding_cache.get(key)
+        if cached is not MISSING:
+            return cached.tolist()
+        embedding = await self.embedding_gen.generate(query_text)
+        if embedding:
+            self._embedding_cache.set(key, array("f", embedding))
+        return embedding
 
     async def search(self, query_text: str, limit: int = 5) -> List[Dict[str, Any]]:
-        query_embedding = await self.embedding_gen.generate(query_text)
-        if not query_embedding:
-            logger.error("Failed to generate query embedding")
-            return []
-
-        candidates = await self._find_similar(query_embedding, candidate_limit=50)
+        key = text_key(query_text)
+        candidates = self._candidate_cache.get(key)
+        if candidates is MISSING:
+            query_embedding = await self._embed_query(query_text, key)
+            if not query_embedding:
+                logger.error("Failed to generate query embedding")
+                return []
+            candidates = await self._find_similar(query_embedding, candidate_limit=RERANK_CANDIDATES)
+            self._candidate_cache.set(key, candidates)
         if not candidates:
             return []
 
@@ -37,32 +72,47 @@ class SearchEngine:
 
     async def _find_similar(self, embedding: List[float], candidate_limit: int = 50) -> List[Dict[str, Any]]:
         cutoff = datetime.utcnow() - timedelta(days=MAX_LISTING_AGE_DAYS)
+        distance = Listing.embedding.cosine_distance(embedding)
+        # Rank on the halfvec cast to hit ix_listings_embedding_hnsw_half;
+        # the reported similarity still comes from the fp32 column.
+        half_distance = cast(Listing.embedding, HALFVEC(1536)).cosine_distance(embedding)
+        # Columns only: loading Listing would hydrate ORM objects and pull each
+        # row's 1536-dim embedding over the wire just to drop it
+        stmt = (
+            select(
+                Listing.id,
+                Listing.source_channel,
+                Listing.source_message_id,
+                Listing.raw_text,
+                Listing.has_media,
+                Listing.created_at,
+                (1 - distance).label("similarity_score"),
+                Listing.item_metadata.label("metadata"),
+                Listing.price,
+                Listing.currency,
+            )
+            .where(Listing.created_at >= cutoff)
+            .limit(candidate_limit)
+        )
         async with get_session() as session:
-            rows = (await session.execute(
-                select(
-                    Listing,
-                    (1 - Listing.embedding.cosine_distance(embedding)).label("similarity"),
-                )
-                .where(Listing.created_at >= cutoff)
-                .order_by(text("similarity DESC"))
-                .limit(candidate_limit)
-            )).all()
-
-        return [
-            {
-                "id": listing.id,
-                "source_channel": listing.source_channel,
-                "source_message_id": listing.source_message_id,
-                "raw_text": listing.raw_text,
-                "has_media": listing.has_media,
-                "created_at": listing.created_at.isoformat() if listing.created_at else None,
-                "similarity_score": float(sim),
-                "metadata": listing.item_metadata,
-                "price": listing.price,
-                "currency": listing.currency,
-            }
-            for listing, sim in rows
-        ]
+            # SET does not accept bind params; the value is always an int.
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {max(HNSW_EF_SEARCH, candidate_limit)}"))
+            # The age filter runs after the index scan; keep scanning past stale
+            # rows instead of returning short (pgvector >= 0.8)
+            await session.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+            rows = (await session.execute(stmt.order_by(half_distance))).all()
+            if len(rows) < candidate_limit:
+                # Iterative scans stop at hnsw.max_scan_tuples; the exact scan (no
+                # index on the fp32 expression) always finds every fresh match
+                rows = (await session.execute(stmt.order_by(distance))).all()
+        # relaxed_order may return rows slightly out of order
+        rows = sorted(rows, key=lambda r: r.similarity_score, reverse=True)
+
+        results = [dict(row._mapping) for row in rows]
+        for r in results:
+            r["created_at"] = r["created_at"].isoformat() if r["created_at"] else None
+            r["similarity_score"] = float(r["similarity_score"])
+        return results
 
     # ------------------------------------------------------------------
     # Deal detection: median-neighbor algorithm
@@ -133,7 +183,7 @@ class SearchEngine:
         Returns dict with median, mean, min, max, sample_count, sample_listings
         or None if insufficient data.
         """
-        query_embedding = await self.embedding_gen.generate(query_text)
+        query_embedding = await self._embed_query(query_text, text_key(query_text))
         if not query_embedding:
             return None
 
@@ -1,6 +1,6 @@
 """
 Search quality test — sends real queries through the full pipeline
-(embed → pgvector top 50 → AI rerank → top 5) and evaluates whether
+(embed → pgvector top 20 → AI rerank → top 5) and evaluates whether
 the returned listings actually match what a user would expect.
 
 Usage:
@@ -1 +1 @@
-"""Shared utilities — logging, channel file management."""
+"""Shared utilities — logging, channel file management, rate limiting, caching, event-loop bootstrap, system stats."""
@@ -0,0 +1,55 @@
+"""Small in-process TTL + LRU cache for hot lookups (no external store)."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Tuple, TypeVar
+
+V = TypeVar("V")
+
+MISSING: Any = object()  # sentinel so cached None values are distinguishable from misses
+
+
+def text_key(text: str) -> str:
+    """Whitespace/case-insensitive fingerprint of *text*, for use as a cache key."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+class TTLCache(Generic[V]):
+    """Mapping that keeps at most *maxsize* entries, each for *ttl* seconds.
+
+    Least-recently-used entries are evicted first once full. Not thread-safe;
+    meant for a single asyncio event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the cached value, or *default* if absent or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
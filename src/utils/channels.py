@@ -2,36 +2,43 @@
 
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 from loguru import logger
 
 CHANNELS_FILE = Path("channels.txt")
 
+# (st_mtime_ns, parsed channels) — re-parsed only when the file changes
+_cache: Tuple[int, List[str]] = (-1, [])
+
 
 def load_channels() -> List[str]:
-    """Read channel usernames from channels.txt (ignores comments and blanks)."""
+    """Read channel usernames from channels.txt (ignores comments and blanks).
+
+    The parsed list is cached and only re-read when the file's mtime changes.
+    """
+    global _cache
     if not CHANNELS_FILE.exists():
         CHANNELS_FILE.write_text("# Monitored Telegram Channels\n# One per line, with or without @\n")
         return []
 
-    channels = []
-    for line in CHANNELS_FILE.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line and not line.startswith("#"):
-            if not line.startswith("@"):
-                line = "@" + line
-            channels.append(line)
+    mtime = CHANNELS_FILE.stat().st_mtime_ns
+    if mtime != _cache[0]:
+        lines = (line.strip() for line in CHANNELS_FILE.read_text(encoding="utf-8").splitlines())
+        channels = [line if line[0] == "@" else "@" + line for line in lines if line and line[0] != "#"]
+        _cache = (mtime, channels)
+        logger.info(f"Loaded {len(channels)} channels from {CHANNELS_FILE}")
 
-    logger.info(f"Loaded {len(channels)} channels from {CHANNELS_FILE}")
-    return channels
+    return list(_cache[1])  # copy — callers append/remove before save_channels()
 
 
 def save_channels(channels: List[str]) -> None:
-    """Overwrite channels.txt with the given list."""
+    """Overwrite channels.txt with the given list (and prime the cache with it)."""
+    global _cache
     with open(CHANNELS_FILE, "w", encoding="utf-8") as f:
         f.write("# Monitored Telegram Channels\n# One per line, with or without @\n\n")
         for ch in channels:
             f.write(f"{ch}\n")
+    _cache = (CHANNELS_FILE.stat().st_mtime_ns, [ch if ch.startswith("@") else "@" + ch for ch in channels])
     logger.info(f"Saved {len(channels)} channels to {CHANNELS_FILE}")
 
 
@@ -0,0 +1,40 @@
+"""Async token-bucket rate limiter shared between concurrent tasks."""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Allow up to *rate* acquisitions per *period* seconds (bursts up to *rate*).
+
+    Usage:
+        limiter = RateLimiter(30)        # 30 per second
+        async with limiter:
+            await do_request()
+    """
+
+    def __init__(self, rate: float, period: float = 1.0) -> None:
+        self._capacity = rate
+        self._tokens = rate
+        self._fill_rate = rate / period
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._fill_rate)
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
@@ -0,0 +1,24 @@
+"""Event-loop bootstrap for the process entrypoints.
+
+uvloop is optional and deliberately not in requirements.txt; `pip install uvloop`
+on the host to opt in.
+"""
+
+import asyncio
+import sys
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """``asyncio.run`` on uvloop when it is installed (Linux/macOS), stock loop otherwise."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    if sys.version_info < (3, 11):
+        uvloop.install()
+        return asyncio.run(main)
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(main)
@@ -0,0 +1,34 @@
+"""Host resource snapshot read straight from /proc and statvfs (no subprocesses)."""
+
+import os
+from typing import Dict
+
+
+def _meminfo() -> Dict[str, int]:
+    """Parse /proc/meminfo into {field: kB}."""
+    info: Dict[str, int] = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            info[key] = int(rest.split()[0])
+    return info
+
+
+def get_system_info() -> str:
+    """RAM, swap and root-disk usage formatted like ``free -m`` / ``df -h``. Linux only."""
+    mem = _meminfo()
+    ram_total = mem["MemTotal"] // 1024
+    ram_used = (mem["MemTotal"] - mem.get("MemAvailable", mem["MemFree"])) // 1024
+    swap_total = mem.get("SwapTotal", 0) // 1024
+    swap_used = swap_total - mem.get("SwapFree", 0) // 1024
+
+    st = os.statvfs("/")
+    disk_total = st.f_blocks * st.f_frsize
+    disk_used = disk_total - st.f_bfree * st.f_frsize
+    disk_pct = disk_used * 100 / (disk_used + st.f_bavail * st.f_frsize)  # df's Use% excludes root-reserved blocks
+
+    return (
+        f"RAM: {ram_used}/{ram_total}MB ({ram_used * 100 / ram_total:.0f}%)\n"
+        f"Swap: {swap_used}/{swap_total}MB\n"
+        f"Disk: {disk_used / 2**30:.1f}G/{disk_total / 2**30:.1f}G ({disk_pct:.0f}%)"
+    )